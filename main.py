@@ -9,23 +9,50 @@ import os
 
 # Add src directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
-# sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import click
 import fnmatch
-from rich.console import Console
-from rich.table import Table
-from rich.panel import Panel
-from rich.progress import Progress, SpinnerColumn, TextColumn, BarColumn, TaskProgressColumn, TimeRemainingColumn
-from rich import print as rprint
-
-from hf_client import HuggingFaceClient
-from local_scanner import LocalScanner, DirectScanner
-from comparator import Comparator
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+# hf_client, local_scanner and comparator (huggingface_hub, requests, ...) are
+# imported inside the commands that use them, so --help starts quickly; the
+# same goes for rich, which only the output helpers below need
 from models import MatchStatus, ComparisonSummary
 
 
-console = Console()
+class _LazyConsole:
+    """Stand-in for the shared rich Console that creates it on first use."""
+    
+    _console = None
+    
+    def _get(self):
+        if _LazyConsole._console is None:
+            from rich.console import Console
+            _LazyConsole._console = Console()
+        return _LazyConsole._console
+    
+    def __getattr__(self, name):
+        return getattr(self._get(), name)
+    
+    def __setattr__(self, name, value):
+        setattr(self._get(), name, value)
+
+
+console = _LazyConsole()
+
+# Result tables with more rows than this are printed as plain aligned text
+BULK_TABLE_THRESHOLD = 500
+
+# Lines formatted, encoded and written at a time by the exports
+EXPORT_BATCH_LINES = 4096
+
+# Units used by format_size, one per power of 1024
+SIZE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
 
 # CLI Group
 
@@ -55,19 +82,87 @@ def cli(ctx):
 
 def print_summary(summary: ComparisonSummary):
     """Print a formatted summary of the comparison."""
+    from rich.panel import Panel
+    from rich.text import Text
+    
+    # Create summary panel from styled segments, so Rich has no markup to parse
+    summary_text = Text.assemble(
+        "\n",
+        ("Total HuggingFace files:", "bold"), f" {summary.total_hf_files}\n",
+        ("Total local metadata files:", "bold"), f" {summary.total_local_files}\n",
+        "\n",
+        ("✓ Matches (SHA256 verified):", "green"), f" {summary.match_count}\n",
+        ("⚠ Name matches only:", "yellow"), f" {summary.name_match_only_count}\n",
+        ("✗ SHA256 mismatches:", "red"), f" {summary.mismatch_count}\n",
+        ("↓ Missing locally:", "blue"), f" {summary.missing_local_count}\n",
+    )
+    
+    console.print(Panel(summary_text, title=Text("Comparison Summary", style="bold"), border_style="cyan"))
+
+
+@lru_cache(maxsize=4096)
+def _short_sha(sha256: str) -> str:
+    """Shortened SHA256 for tables (cached; the same hashes show up in several tables)."""
+    return sha256[:16] + "..." if sha256 else "N/A"
+
+
+def _print_table(
+    title: str,
+    columns: List[Tuple[str, str]],
+    rows: List[Tuple[str, ...]],
+    export_option: Optional[str] = None
+):
+    """
+    Print rows as a Rich table, or as plain aligned text for large result sets.
+    
+    Rich measures and lays out every cell of a Table, which gets slow with
+    thousands of rows; past BULK_TABLE_THRESHOLD the columns are padded in one
+    pass and printed as a single block instead. On an interactive terminal only
+    the first few screenfuls are printed, with a note pointing at the export
+    option that writes the full list; piped output gets every row.
+    
+    Args:
+        title: Table title (Rich markup)
+        columns: (header, style) for each column
+        rows: Cell strings for each row
+        export_option: CLI option that exports the full list, for the truncation note
+    """
+    from rich.table import Table
+    
+    hidden = 0
+    if console.is_terminal:
+        limit = max(50, console.size.height * 4)
+        if len(rows) > limit:
+            hidden = len(rows) - limit
+            rows = rows[:limit]
+    
+    if len(rows) <= BULK_TABLE_THRESHOLD:
+        table = Table(title=title)
+        for header, style in columns:
+            table.add_column(header, style=style)
+        for row in rows:
+            table.add_row(*row)
+        console.print(table)
+    else:
+        _print_plain_table(title, [header for header, _ in columns], rows)
     
-    # Create summary panel
-    summary_text = f"""
-[bold]Total HuggingFace files:[/bold] {summary.total_hf_files}
-[bold]Total local metadata files:[/bold] {summary.total_local_files}
+    if hidden:
+        hint = f"; use {export_option} for the full list" if export_option else ""
+        console.print(f"[dim]... and {hidden} more not shown{hint}[/dim]")
 
-[green]✓ Matches (SHA256 verified):[/green] {summary.match_count}
-[yellow]⚠ Name matches only:[/yellow] {len(summary.name_matches_only)}
-[red]✗ SHA256 mismatches:[/red] {summary.mismatch_count}
-[blue]↓ Missing locally:[/blue] {summary.missing_local_count}
-"""
+
+def _print_plain_table(title: str, headers: List[str], rows: List[Tuple[str, ...]]):
+    """Print rows as padded plain-text columns (see _print_table)."""
+    rows = [[cell or "" for cell in row] for row in rows]
+    widths = [max(len(headers[i]), max(len(row[i]) for row in rows)) for i in range(len(headers))]
     
-    console.print(Panel(summary_text, title="[bold]Comparison Summary[/bold]", border_style="cyan"))
+    def format_row(cells):
+        return "  ".join(cell.ljust(width) for cell, width in zip(cells, widths)).rstrip()
+    
+    console.print(title)
+    # Cells are file names and paths, not markup; soft_wrap keeps long rows on one line
+    console.print(format_row(headers), style="bold", markup=False, highlight=False, soft_wrap=True)
+    console.print("\n".join(format_row(row) for row in rows), markup=False, highlight=False, soft_wrap=True)
 
 
 def print_matches(summary: ComparisonSummary, show_all: bool = False):
@@ -75,19 +170,18 @@ def print_matches(summary: ComparisonSummary, show_all: bool = False):
     if not summary.matches:
         return
     
-    if not show_all and len(summary.matches) > 10:
-        console.print(f"\n[green]✓ {len(summary.matches)} files matched by SHA256[/green] (use --verbose to see all)")
+    if not show_all and summary.match_count > 10:
+        console.print(f"\n[green]✓ {summary.match_count} files matched by SHA256[/green] (use --verbose to see all)")
         return
     
-    table = Table(title="[green]Matched Files (SHA256 Verified)[/green]")
-    table.add_column("Filename", style="green")
-    table.add_column("SHA256", style="dim")
-    
-    for match in summary.matches:
-        sha_display = match.remote_sha256[:16] + "..." if match.remote_sha256 else "N/A"
-        table.add_row(match.filename, sha_display)
+    rows = [(match.filename, _short_sha(match.remote_sha256)) for match in summary.matches]
     
-    console.print(table)
+    _print_table(
+        "[green]Matched Files (SHA256 Verified)[/green]",
+        [("Filename", "green"), ("SHA256", "dim")],
+        rows,
+        "--export-matches"
+    )
 
 
 def print_missing(summary: ComparisonSummary):
@@ -95,23 +189,22 @@ def print_missing(summary: ComparisonSummary):
     if not summary.missing_local:
         return
     
-    table = Table(title="[blue]Files Missing Locally[/blue]")
-    table.add_column("Filename", style="blue")
-    table.add_column("Remote Path", style="dim")
-    table.add_column("SHA256", style="dim")
-    table.add_column("Size", style="dim")
-    
-    for item in summary.missing_local:
-        size_str = format_size(item.remote_size) if item.remote_size else "Unknown"
-        sha_display = item.remote_sha256[:16] + "..." if item.remote_sha256 else "N/A"
-        table.add_row(
+    rows = [
+        (
             item.filename,
             item.remote_path or "",
-            sha_display,
-            size_str
+            _short_sha(item.remote_sha256),
+            format_size(item.remote_size) if item.remote_size else "Unknown"
         )
+        for item in summary.missing_local
+    ]
     
-    console.print(table)
+    _print_table(
+        "[blue]Files Missing Locally[/blue]",
+        [("Filename", "blue"), ("Remote Path", "dim"), ("SHA256", "dim"), ("Size", "dim")],
+        rows,
+        "--export-missing"
+    )
 
 
 def print_mismatches(summary: ComparisonSummary):
@@ -119,17 +212,17 @@ def print_mismatches(summary: ComparisonSummary):
     if not summary.mismatches:
         return
     
-    table = Table(title="[red]SHA256 Mismatches (Different Versions?)[/red]")
-    table.add_column("Filename", style="red")
-    table.add_column("Local SHA256", style="yellow")
-    table.add_column("Remote SHA256", style="cyan")
+    rows = [
+        (item.filename, _short_sha(item.local_sha256), _short_sha(item.remote_sha256))
+        for item in summary.mismatches
+    ]
     
-    for item in summary.mismatches:
-        local_sha = item.local_sha256[:16] + "..." if item.local_sha256 else "N/A"
-        remote_sha = item.remote_sha256[:16] + "..." if item.remote_sha256 else "N/A"
-        table.add_row(item.filename, local_sha, remote_sha)
-    
-    console.print(table)
+    _print_table(
+        "[red]SHA256 Mismatches (Different Versions?)[/red]",
+        [("Filename", "red"), ("Local SHA256", "yellow"), ("Remote SHA256", "cyan")],
+        rows,
+        "--export-mismatches"
+    )
 
 
 def print_name_matches(summary: ComparisonSummary):
@@ -137,19 +230,16 @@ def print_name_matches(summary: ComparisonSummary):
     if not summary.name_matches_only:
         return
     
-    table = Table(title="[yellow]Name Matches (SHA256 Not Verified)[/yellow]")
-    table.add_column("Filename", style="yellow")
-    table.add_column("Local Path", style="dim")
-    table.add_column("Notes", style="dim")
-    
-    for item in summary.name_matches_only:
-        table.add_row(
-            item.filename,
-            item.local_path or "Unknown",
-            item.notes
-        )
+    rows = [
+        (item.filename, item.local_path or "Unknown", item.notes)
+        for item in summary.name_matches_only
+    ]
     
-    console.print(table)
+    _print_table(
+        "[yellow]Name Matches (SHA256 Not Verified)[/yellow]",
+        [("Filename", "yellow"), ("Local Path", "dim"), ("Notes", "dim")],
+        rows
+    )
 
 
 def format_size(size_bytes: int) -> str:
@@ -157,115 +247,229 @@ def format_size(size_bytes: int) -> str:
     if size_bytes is None:
         return "Unknown"
     
-    for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-        if size_bytes < 1024:
-            return f"{size_bytes:.1f} {unit}"
-        size_bytes /= 1024
-    return f"{size_bytes:.1f} PB"
+    # Pick the unit from the bit length instead of dividing in a loop; dividing
+    # by a power of two is exact, so the result is the same as repeated / 1024
+    if size_bytes < 1024:
+        exp = 0
+    else:
+        exp = min(5, (int(size_bytes).bit_length() - 1) // 10)
+    return f"{size_bytes / (1 << (exp * 10)):.1f} {SIZE_UNITS[exp]}"
+
+
+def _write_lines(path: str, lines: Iterable[str]):
+    """
+    Write an export file as UTF-8, streaming it in batches of lines.
+    
+    Only EXPORT_BATCH_LINES lines are held at a time, so large exports never
+    exist as one big list and string together. Each batch is joined and encoded
+    once and written in binary mode, skipping TextIOWrapper; newlines are still
+    translated to the platform's line ending, as text mode would.
+    """
+    it = iter(lines)
+    translate = os.linesep != "\n"
+    with open(path, 'wb') as f:
+        write = f.write
+        while True:
+            batch = list(islice(it, EXPORT_BATCH_LINES))
+            if not batch:
+                break
+            text = "".join(batch)
+            if translate:
+                text = text.replace("\n", os.linesep)
+            write(text.encode('utf-8'))
+
+
+def _missing_lines(summary: ComparisonSummary) -> Iterator[str]:
+    """Lines of the missing-files export."""
+    yield "# Files missing locally from HuggingFace repository\n"
+    yield f"# Total: {summary.missing_local_count} files\n\n"
+    fmt = format_size  # global looked up once, not per item
+    for item in summary.missing_local:
+        yield f"{item.remote_path or item.filename}\n"
+        if item.visit_url:
+            yield f"  View: {item.visit_url}\n"
+        if item.download_url:
+            yield f"  Download: {item.download_url}\n"
+        if item.remote_sha256:
+            yield f"  SHA256: {item.remote_sha256}\n"
+        if item.remote_size:
+            yield f"  Size: {fmt(item.remote_size)}\n"
+        yield "\n"
+
+
+def _urls_lines(summary: ComparisonSummary) -> Iterator[str]:
+    """Lines of the download-URL export (one URL per line)."""
+    for item in summary.missing_local:
+        if item.download_url:
+            yield f"{item.download_url}\n"
+
+
+def _matches_lines(summary: ComparisonSummary) -> Iterator[str]:
+    """Lines of the matched-files export."""
+    yield "# Files you have that match the HuggingFace repository (SHA256 verified)\n"
+    yield f"# Total: {summary.match_count} files\n\n"
+    fmt = format_size
+    for item in summary.matches:
+        yield f"{item.filename}\n"
+        if item.local_path:
+            yield f"  Local path: {item.local_path}\n"
+        if item.remote_sha256:
+            yield f"  SHA256: {item.remote_sha256}\n"
+        if item.remote_size:
+            yield f"  Size: {fmt(item.remote_size)}\n"
+        yield "\n"
+
+
+def _mismatches_lines(summary: ComparisonSummary) -> Iterator[str]:
+    """Lines of the mismatched-files export."""
+    yield "# Files with SHA256 mismatches (different versions)\n"
+    yield f"# Total: {summary.mismatch_count} files\n\n"
+    fmt = format_size
+    for item in summary.mismatches:
+        yield f"{item.filename}\n"
+        if item.local_path:
+            yield f"  Local path: {item.local_path}\n"
+        yield f"  Local SHA256:  {item.local_sha256 or 'N/A'}\n"
+        yield f"  Remote SHA256: {item.remote_sha256 or 'N/A'}\n"
+        if item.visit_url:
+            yield f"  View new version: {item.visit_url}\n"
+        if item.download_url:
+            yield f"  Download new version: {item.download_url}\n"
+        if item.remote_size:
+            yield f"  Remote size: {fmt(item.remote_size)}\n"
+        if item.local_size:
+            yield f"  Local size: {fmt(item.local_size)}\n"
+        yield "\n"
+
+
+def _summary_lines(summary: ComparisonSummary) -> Iterator[str]:
+    """Lines of export_all's summary.txt."""
+    yield "# HuggingFace File Checker Summary\n\n"
+    yield f"Total HuggingFace files: {summary.total_hf_files}\n"
+    yield f"Total local metadata files: {summary.total_local_files}\n\n"
+    yield f"Matches (SHA256 verified): {summary.match_count}\n"
+    yield f"Name matches only: {summary.name_match_only_count}\n"
+    yield f"SHA256 mismatches: {summary.mismatch_count}\n"
+    yield f"Missing locally: {summary.missing_local_count}\n"
 
 
 def export_missing(summary: ComparisonSummary, output_file: str):
     """Export missing files to a text file."""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("# Files missing locally from HuggingFace repository\n")
-        f.write(f"# Total: {summary.missing_local_count} files\n\n")
-        
-        for item in summary.missing_local:
-            f.write(f"{item.remote_path or item.filename}\n")
-            if item.visit_url:
-                f.write(f"  View: {item.visit_url}\n")
-            if item.download_url:
-                f.write(f"  Download: {item.download_url}\n")
-            if item.remote_sha256:
-                f.write(f"  SHA256: {item.remote_sha256}\n")
-            if item.remote_size:
-                f.write(f"  Size: {format_size(item.remote_size)}\n")
-            f.write("\n")
-    
+    _write_lines(output_file, _missing_lines(summary))
     console.print(f"[green]Exported missing files list to: {output_file}[/green]")
 
 
 def export_urls(summary: ComparisonSummary, output_file: str):
     """Export just download URLs for missing files (one per line, for wget/aria2c)."""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for item in summary.missing_local:
-            if item.download_url:
-                f.write(f"{item.download_url}\n")
-    
+    _write_lines(output_file, _urls_lines(summary))
     console.print(f"[green]Exported {summary.missing_local_count} download URLs to: {output_file}[/green]")
 
 
 def export_matches(summary: ComparisonSummary, output_file: str):
     """Export matched files to a text file."""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("# Files you have that match the HuggingFace repository (SHA256 verified)\n")
-        f.write(f"# Total: {summary.match_count} files\n\n")
-        
-        for item in summary.matches:
-            f.write(f"{item.filename}\n")
-            if item.local_path:
-                f.write(f"  Local path: {item.local_path}\n")
-            if item.remote_sha256:
-                f.write(f"  SHA256: {item.remote_sha256}\n")
-            if item.remote_size:
-                f.write(f"  Size: {format_size(item.remote_size)}\n")
-            f.write("\n")
-    
+    _write_lines(output_file, _matches_lines(summary))
     console.print(f"[green]Exported matched files list to: {output_file}[/green]")
 
 
 def export_mismatches(summary: ComparisonSummary, output_file: str):
     """Export mismatched files to a text file."""
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write("# Files with SHA256 mismatches (different versions)\n")
-        f.write(f"# Total: {summary.mismatch_count} files\n\n")
-        
-        for item in summary.mismatches:
-            f.write(f"{item.filename}\n")
-            if item.local_path:
-                f.write(f"  Local path: {item.local_path}\n")
-            f.write(f"  Local SHA256:  {item.local_sha256 or 'N/A'}\n")
-            f.write(f"  Remote SHA256: {item.remote_sha256 or 'N/A'}\n")
-            if item.visit_url:
-                f.write(f"  View new version: {item.visit_url}\n")
-            if item.download_url:
-                f.write(f"  Download new version: {item.download_url}\n")
-            if item.remote_size:
-                f.write(f"  Remote size: {format_size(item.remote_size)}\n")
-            if item.local_size:
-                f.write(f"  Local size: {format_size(item.local_size)}\n")
-            f.write("\n")
-    
+    _write_lines(output_file, _mismatches_lines(summary))
     console.print(f"[green]Exported mismatched files list to: {output_file}[/green]")
 
 
+def export_summary_json(summary: ComparisonSummary, output_file: str):
+    """Export the result counts as JSON (orjson when installed)."""
+    data = {
+        'total_hf_files': summary.total_hf_files,
+        'total_local_files': summary.total_local_files,
+        'matches': summary.match_count,
+        'name_matches_only': summary.name_match_only_count,
+        'mismatches': summary.mismatch_count,
+        'missing_local': summary.missing_local_count,
+    }
+    try:
+        import orjson
+        blob = orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    except ImportError:
+        import json
+        blob = json.dumps(data, indent=2).encode('utf-8')
+    
+    with open(output_file, 'wb') as f:
+        f.write(blob + b"\n")
+    
+    console.print(f"[green]Exported summary to: {output_file}[/green]")
+
+
 def export_all(summary: ComparisonSummary, output_dir: str):
     """Export all lists to separate files in a directory."""
-    import os
     os.makedirs(output_dir, exist_ok=True)
+    paths = {
+        kind: os.path.join(output_dir, filename)
+        for kind, filename in (
+            ('matches', "matched_files.txt"),
+            ('missing', "missing_files.txt"),
+            ('urls', "download_urls.txt"),
+            ('mismatches', "mismatched_files.txt"),
+            ('summary', "summary.txt"),
+        )
+    }
     
+    # Collect every file as (path, lines, message)
+    exports = []
     if summary.matches:
-        export_matches(summary, os.path.join(output_dir, "matched_files.txt"))
+        exports.append((paths['matches'], _matches_lines(summary),
+                        f"Exported matched files list to: {paths['matches']}"))
     if summary.missing_local:
-        export_missing(summary, os.path.join(output_dir, "missing_files.txt"))
-        export_urls(summary, os.path.join(output_dir, "download_urls.txt"))
+        exports.append((paths['missing'], _missing_lines(summary),
+                        f"Exported missing files list to: {paths['missing']}"))
+        exports.append((paths['urls'], _urls_lines(summary),
+                        f"Exported {summary.missing_local_count} download URLs to: {paths['urls']}"))
     if summary.mismatches:
-        export_mismatches(summary, os.path.join(output_dir, "mismatched_files.txt"))
+        exports.append((paths['mismatches'], _mismatches_lines(summary),
+                        f"Exported mismatched files list to: {paths['mismatches']}"))
     
     # Also create a summary file
-    summary_file = os.path.join(output_dir, "summary.txt")
-    with open(summary_file, 'w', encoding='utf-8') as f:
-        f.write("# HuggingFace File Checker Summary\n\n")
-        f.write(f"Total HuggingFace files: {summary.total_hf_files}\n")
-        f.write(f"Total local metadata files: {summary.total_local_files}\n\n")
-        f.write(f"Matches (SHA256 verified): {summary.match_count}\n")
-        f.write(f"Name matches only: {len(summary.name_matches_only)}\n")
-        f.write(f"SHA256 mismatches: {summary.mismatch_count}\n")
-        f.write(f"Missing locally: {summary.missing_local_count}\n")
+    exports.append((paths['summary'], _summary_lines(summary), None))
+    
+    # Then write them concurrently; they're independent files, so the open/write/
+    # close round trips (slow on network drives) overlap instead of queueing
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        list(executor.map(_write_lines, [e[0] for e in exports], [e[1] for e in exports]))
     
+    for _, _, message in exports:
+        if message:
+            console.print(f"[green]{message}[/green]")
     console.print(f"[green]Exported all results to: {output_dir}/[/green]")
 
 
+def _start_in_background(fn: Callable[[], Any]) -> Callable[[], Any]:
+    """
+    Run fn on a daemon thread; returns a function that waits for and returns its result.
+    
+    A daemon thread doesn't hold up interpreter exit, so sys.exit or Ctrl+C
+    while fn is still running quits right away instead of waiting for it.
+    Exceptions raised by fn are re-raised by the returned function.
+    """
+    outcome = {}
+    
+    def run():
+        try:
+            outcome['result'] = fn()
+        except BaseException as e:
+            outcome['error'] = e
+    
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    
+    def result():
+        thread.join()
+        if 'error' in outcome:
+            raise outcome['error']
+        return outcome['result']
+    
+    return result
+
+
 # CHECK Command (main comparison functionality)
 
 @cli.command()
@@ -282,11 +486,13 @@ def export_all(summary: ComparisonSummary, output_dir: str):
 @click.option('--export-matches', 'export_matches_file', help='Export matched files list to a file')
 @click.option('--export-mismatches', 'export_mismatches_file', help='Export mismatched files list to a file')
 @click.option('--export-all', 'export_all_dir', help='Export all lists to a directory')
+@click.option('--summary-json', 'summary_json_file', help='Write the result counts to a JSON file (for CI and other tools)')
 @click.option('--token', envvar='HF_TOKEN', help='HuggingFace API token (or set HF_TOKEN env var)')
 @click.option('--branch', default='main', help='Repository branch to check (default: main)')
 @click.option('--no-cache', is_flag=True, help='Disable caching (rescan all files every time)')
 @click.option('--clear-cache', is_flag=True, help='Clear the cache before scanning')
-def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, filter_pattern, verbose, export_file, export_urls_file, export_matches_file, export_mismatches_file, export_all_dir, token, branch, no_cache, clear_cache):
+@click.option('--quiet', '-q', is_flag=True, help='No console output, just one "matches/mismatches/missing" count line on stderr (for scripts using the exit code)')
+def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, filter_pattern, verbose, export_file, export_urls_file, export_matches_file, export_mismatches_file, export_all_dir, summary_json_file, token, branch, no_cache, clear_cache, quiet):
     """
     Check if you have files from a HuggingFace repository by comparing SHA256 hashes.
     
@@ -297,6 +503,9 @@ def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, f
         python main.py --hf-repo "K3NK/loras-WAN" --local-dir "./metadata" --safetensors-only
     """
     
+    # Quiet runs skip all Rich rendering (including status and progress bars)
+    console.quiet = quiet
+    
     # Validate inputs
     if not hf_url and not hf_repo:
         console.print("[red]Error: Must provide either --hf-url or --hf-repo[/red]")
@@ -306,21 +515,22 @@ def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, f
         console.print(f"[red]Error: Local directory does not exist: {local_dir}[/red]")
         sys.exit(1)
     
+    from hf_client import HuggingFaceClient
+    from local_scanner import LocalScanner, DirectScanner
+    from comparator import Comparator
+    from rich.panel import Panel
+    
     console.print(Panel.fit(
         "[bold cyan]HuggingFace File Checker[/bold cyan]\n"
         "Comparing local files against HuggingFace repository",
         border_style="cyan"
     ))
     
-    # Initialize HuggingFace client
-    with Progress(
-        SpinnerColumn(),
-        TextColumn("[progress.description]{task.description}"),
-        console=console
-    ) as progress:
+    # A spinner with the current step; console.status is a single spinner
+    # renderable, without Progress's task table and columns
+    with console.status("Connecting to HuggingFace...") as status:
         
         # Create HF client
-        task = progress.add_task("Connecting to HuggingFace...", total=None)
         try:
             if hf_url:
                 hf_client = HuggingFaceClient.from_url(hf_url, token=token)
@@ -334,29 +544,18 @@ def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, f
             console.print(f"[red]Error connecting to HuggingFace: {e}[/red]")
             sys.exit(1)
         
-        # Fetch HuggingFace files
-        progress.update(task, description="Fetching files from HuggingFace...")
-        try:
-            if safetensors_only:
-                hf_files = hf_client.fetch_safetensors_only()
-                console.print(f"[green]✓[/green] Found [cyan]{len(hf_files)}[/cyan] .safetensors files on HuggingFace")
-            else:
-                hf_files = hf_client.fetch_all_files()
-                console.print(f"[green]✓[/green] Found [cyan]{len(hf_files)}[/cyan] files on HuggingFace")
-            
-            # Apply filter if specified
-            if filter_pattern:
-                original_count = len(hf_files)
-                hf_files = [f for f in hf_files if fnmatch.fnmatch(f.path.lower(), filter_pattern.lower())]
-                console.print(f"[green]✓[/green] Filter [cyan]{filter_pattern}[/cyan]: {len(hf_files)}/{original_count} files match")
-        except Exception as e:
-            console.print(f"[red]Error fetching HuggingFace files: {e}[/red]")
-            sys.exit(1)
+        # List the repo on a background thread while the local scan runs on this
+        # one; both are I/O-bound, so the wait becomes the slower of the two
+        # instead of their sum. The scan stays on the main thread so Ctrl+C and
+        # its progress bar behave as before, and a failed scan exits without
+        # waiting for the listing.
+        fetch = hf_client.fetch_safetensors_only if safetensors_only else hf_client.fetch_all_files
+        hf_result = _start_in_background(fetch)
         
         # Scan local files
         if scan_files:
             # Direct file scanning mode - hash actual model files
-            progress.update(task, description="Finding model files...")
+            status.update("Finding model files...")
             try:
                 scanner = DirectScanner(local_dir, use_cache=not no_cache)
                 
@@ -366,7 +565,7 @@ def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, f
                 # Determine extensions to scan
                 extensions = ['.safetensors'] if safetensors_only else ['.safetensors', '.ckpt', '.pt', '.bin']
                 
-                local_files = scanner.scan(extensions=extensions)
+                local_files = scanner.scan(extensions=extensions, show_progress=not quiet)
                 
                 stats = scanner.stats
                 
@@ -387,7 +586,7 @@ def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, f
                 sys.exit(1)
         else:
             # Metadata JSON mode (default)
-            progress.update(task, description="Scanning local metadata files...")
+            status.update("Scanning local metadata files...")
             try:
                 scanner = LocalScanner(local_dir, use_cache=not no_cache)
                 
@@ -410,8 +609,32 @@ def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, f
                 console.print(f"[red]Error scanning local files: {e}[/red]")
                 sys.exit(1)
         
+        # Fetch HuggingFace files
+        status.update("Fetching files from HuggingFace...")
+        try:
+            hf_files = hf_result()
+            if safetensors_only:
+                console.print(f"[green]✓[/green] Found [cyan]{len(hf_files)}[/cyan] .safetensors files on HuggingFace")
+            else:
+                console.print(f"[green]✓[/green] Found [cyan]{len(hf_files)}[/cyan] files on HuggingFace")
+            
+            # Apply filter if specified
+            if filter_pattern:
+                original_count = len(hf_files)
+                # Translate the glob once; IGNORECASE replaces lowercasing every path.
+                # fnmatch on Windows treated backslashes and / alike; repo paths only use /
+                pattern = filter_pattern.lower()
+                if os.sep == '\\':
+                    pattern = pattern.replace('\\', '/')
+                matches_filter = re.compile(fnmatch.translate(pattern), re.IGNORECASE).match
+                hf_files = [f for f in hf_files if matches_filter(f.path)]
+                console.print(f"[green]✓[/green] Filter [cyan]{filter_pattern}[/cyan]: {len(hf_files)}/{original_count} files match")
+        except Exception as e:
+            console.print(f"[red]Error fetching HuggingFace files: {e}[/red]")
+            sys.exit(1)
+        
         # Compare
-        progress.update(task, description="Comparing files...")
+        status.update("Comparing files...")
         comparator = Comparator(
             local_files, 
             hf_files,
@@ -419,29 +642,39 @@ def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, f
             repo_type=hf_client.repo_type,
             revision=hf_client.revision
         )
-        summary = comparator.compare()
-        
-        progress.update(task, description="Done!", completed=True)
+        # Match details are only shown with --verbose or written by the match
+        # exports, and name-only matches are only shown; otherwise counting them is enough
+        summary = comparator.compare(
+            keep_matches=bool(verbose or export_matches_file or export_all_dir),
+            keep_name_matches=not quiet
+        )
     
     # Print results
-    console.print()
-    print_summary(summary)
-    
-    if summary.mismatches:
-        console.print()
-        print_mismatches(summary)
-    
-    if summary.name_matches_only:
-        console.print()
-        print_name_matches(summary)
-    
-    if summary.missing_local:
-        console.print()
-        print_missing(summary)
-    
-    if verbose:
+    if quiet:
+        click.echo(
+            f"matches={summary.match_count} mismatches={summary.mismatch_count} "
+            f"missing={summary.missing_local_count}",
+            err=True
+        )
+    else:
         console.print()
-        print_matches(summary, show_all=True)
+        print_summary(summary)
+        
+        if summary.mismatches:
+            console.print()
+            print_mismatches(summary)
+        
+        if summary.name_matches_only:
+            console.print()
+            print_name_matches(summary)
+        
+        if summary.missing_local:
+            console.print()
+            print_missing(summary)
+        
+        if verbose:
+            console.print()
+            print_matches(summary, show_all=True)
     
     # Export if requested
     if export_all_dir:
@@ -455,6 +688,8 @@ def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, f
             export_matches(summary, export_matches_file)
         if export_mismatches_file and summary.mismatches:
             export_mismatches(summary, export_mismatches_file)
+    if summary_json_file:
+        export_summary_json(summary, summary_json_file)
     
     # Exit code based on results
     if summary.missing_local_count > 0:
@@ -479,7 +714,8 @@ def check(hf_url, hf_repo, repo_type, local_dir, scan_files, safetensors_only, f
 @click.option('--host', default='127.0.0.1', help='Host to bind to (default: 127.0.0.1)')
 @click.option('--add-dir', multiple=True, help='Add directory to scan (can be used multiple times)')
 @click.option('--no-scan', is_flag=True, help='Start server without initial scan')
-def server(port, host, add_dir, no_scan):
+@click.option('--dev', is_flag=True, help="Use Flask's built-in server even if waitress is installed")
+def server(port, host, add_dir, no_scan, dev):
     """
     Run API server for browser extension integration.
     
@@ -498,15 +734,16 @@ def server(port, host, add_dir, no_scan):
     # Add any directories specified on command line
     if add_dir:
         config_manager = get_config_manager()
-        for directory in add_dir:
-            if os.path.isdir(directory):
-                config_manager.add_directory(directory)
-                console.print(f"[green]✓[/green] Added directory: {directory}")
-            else:
-                console.print(f"[yellow]Warning: Directory does not exist: {directory}[/yellow]")
+        with config_manager.batch():
+            for directory in add_dir:
+                if os.path.isdir(directory):
+                    config_manager.add_directory(directory)
+                    console.print(f"[green]✓[/green] Added directory: {directory}")
+                else:
+                    console.print(f"[yellow]Warning: Directory does not exist: {directory}[/yellow]")
     
     # Run the server
-    run_server(host=host, port=port, auto_scan=not no_scan)
+    run_server(host=host, port=port, auto_scan=not no_scan, dev=dev)
 
 
 
@@ -535,6 +772,7 @@ def config(list_dirs, add_dir, remove_dir, mode, show_path):
         python main.py config --remove "H:/AI/models"
     """
     from config import get_config_manager
+    from rich.table import Table
     
     config_manager = get_config_manager()
     
@@ -545,6 +783,7 @@ def config(list_dirs, add_dir, remove_dir, mode, show_path):
     if add_dir:
         if os.path.isdir(add_dir):
             dir_config = config_manager.add_directory(add_dir, scan_mode=mode)
+            config_manager.flush()
             console.print(f"[green]✓[/green] Added: {dir_config.name} ({dir_config.path})")
             console.print(f"  Scan mode: [cyan]{mode}[/cyan]")
         else:
@@ -554,6 +793,7 @@ def config(list_dirs, add_dir, remove_dir, mode, show_path):
     
     if remove_dir:
         if config_manager.remove_directory(remove_dir):
+            config_manager.flush()
             console.print(f"[green]✓[/green] Removed: {remove_dir}")
         else:
             console.print(f"[yellow]Directory not found in config: {remove_dir}[/yellow]")
@@ -1,7 +1,9 @@
 """Matches files by SHA256, falls back to filename if needed."""
 
-from typing import List, Dict, Optional, Set, Literal
-from pathlib import Path
+import sys
+from collections import defaultdict
+from functools import lru_cache
+from typing import Iterable, List, Dict, Optional, Set, Tuple, Literal
 from urllib.parse import quote
 
 from models import (
@@ -9,17 +11,28 @@ from models import (
     LocalFileInfo, 
     ComparisonResult, 
     ComparisonSummary,
-    MatchStatus
+    MatchStatus,
+    filename_stem
 )
 
 
+@lru_cache(maxsize=4096)
+def _encode_path(file_path: str) -> str:
+    """
+    URL encode a repo file path (but keep slashes); shared by download and visit URLs.
+    
+    quote() percent-encodes non-ASCII characters as UTF-8, so the result is plain ASCII.
+    """
+    return quote(file_path, safe="/")
+
+
 class Comparator:
     """Compares local files against HuggingFace repository files"""
     
     def __init__(
         self, 
         local_files: List[LocalFileInfo], 
-        hf_files: List[HFFileInfo],
+        hf_files: Iterable[HFFileInfo],
         repo_id: str = "",
         repo_type: Literal["model", "dataset", "space"] = "model",
         revision: str = "main",
@@ -31,7 +44,7 @@ class Comparator:
         
         Args:
             local_files: List of local file info
-            hf_files: List of HuggingFace file info
+            hf_files: HuggingFace file info (any iterable, e.g. HuggingFaceClient.iter_all_files())
             repo_id: HuggingFace repo ID for generating download URLs
             repo_type: Type of repo (model/dataset/space)
             revision: Branch/revision
@@ -39,88 +52,106 @@ class Comparator:
             match_by_name: Whether to match by filename (fallback)
         """
         self.local_files = local_files
-        self.hf_files = hf_files
+        self.hf_files: List[HFFileInfo] = []  # Filled while indexing
         self.repo_id = repo_id
         self.repo_type = repo_type
         self.revision = revision
         self.match_by_sha256 = match_by_sha256
         self.match_by_name = match_by_name
         
+        # URL prefixes only depend on the repo, so build them once
+        if repo_type == "dataset":
+            repo_base = f"https://huggingface.co/datasets/{repo_id}"
+        elif repo_type == "space":
+            repo_base = f"https://huggingface.co/spaces/{repo_id}"
+        else:
+            repo_base = f"https://huggingface.co/{repo_id}"
+        self._resolve_base = f"{repo_base}/resolve/{revision}/"
+        self._blob_base = f"{repo_base}/blob/{revision}/"
+        
         # Build indexes for fast lookup
         self._local_sha256_index: Dict[str, LocalFileInfo] = {}
-        self._local_name_index: Dict[str, List[LocalFileInfo]] = {}
+        self._local_name_index: Dict[str, List[LocalFileInfo]] = defaultdict(list)
+        self._local_by_size_name: Dict[Tuple[int, str], LocalFileInfo] = {}
+        self._local_size_set: Set[int] = set()
+        self._local_sizes_complete = True  # Size gate is only safe if every local size is known
+        self._local_sha_set: Set[str] = set()
         self._build_local_indexes()
         
         self._hf_sha256_index: Dict[str, HFFileInfo] = {}
         self._hf_name_index: Dict[str, HFFileInfo] = {}
-        self._build_hf_indexes()
+        self._hf_sha_set: Set[str] = set()
+        self._build_hf_indexes(hf_files)
     
-    def _get_download_url(self, file_path: str) -> str:
-        """Generate direct download URL for a HuggingFace file (resolve URL)."""
-        if not self.repo_id:
-            return ""
-        
-        # URL encode the file path (but keep slashes)
-        encoded_path = "/".join(quote(part, safe="") for part in file_path.split("/"))
+    def _get_urls(self, file_path: str) -> Tuple[str, str]:
+        """
+        Generate the URLs for a HuggingFace file, sharing one encoded path.
         
-        # Different base URLs for different repo types
-        if self.repo_type == "dataset":
-            return f"https://huggingface.co/datasets/{self.repo_id}/resolve/{self.revision}/{encoded_path}"
-        elif self.repo_type == "space":
-            return f"https://huggingface.co/spaces/{self.repo_id}/resolve/{self.revision}/{encoded_path}"
-        else:
-            return f"https://huggingface.co/{self.repo_id}/resolve/{self.revision}/{encoded_path}"
-    
-    def _get_visit_url(self, file_path: str) -> str:
-        """Generate page view URL for a HuggingFace file (blob URL)."""
+        Returns:
+            Tuple of (download_url, visit_url): the direct download link
+            (resolve URL) and the page view link (blob URL)
+        """
         if not self.repo_id:
-            return ""
+            return "", ""
         
-        # URL encode the file path (but keep slashes)
-        encoded_path = "/".join(quote(part, safe="") for part in file_path.split("/"))
-        
-        # Different base URLs for different repo types
-        if self.repo_type == "dataset":
-            return f"https://huggingface.co/datasets/{self.repo_id}/blob/{self.revision}/{encoded_path}"
-        elif self.repo_type == "space":
-            return f"https://huggingface.co/spaces/{self.repo_id}/blob/{self.revision}/{encoded_path}"
-        else:
-            return f"https://huggingface.co/{self.repo_id}/blob/{self.revision}/{encoded_path}"
+        encoded = _encode_path(file_path)
+        return self._resolve_base + encoded, self._blob_base + encoded
     
     def _build_local_indexes(self):
         """Build indexes for local files."""
         for f in self.local_files:
+            # Normalize lookup keys once so comparisons don't redo them (the
+            # scanner may already have). Interned names are shared between the
+            # index and the file objects.
+            if not f._base_lc:
+                f._base_lc = sys.intern(f.basename.lower())
+                f._stem_lc = sys.intern(filename_stem(f._base_lc))
+            basename = f._base_lc
+            stem = f._stem_lc
+            
             if f.sha256:
-                self._local_sha256_index[f.sha256.lower()] = f
+                self._local_sha256_index[f.sha256] = f
             
             # Index by various name forms
-            basename = f.basename.lower()
-            if basename not in self._local_name_index:
-                self._local_name_index[basename] = []
             self._local_name_index[basename].append(f)
             
-            # Also index by stem
-            stem = Path(basename).stem
-            if stem not in self._local_name_index:
-                self._local_name_index[stem] = []
-            if f not in self._local_name_index[stem]:
+            # Same size and name is a near-certain match; keep the first one seen
+            if f.size is not None:
+                self._local_by_size_name.setdefault((f.size, basename), f)
+                self._local_size_set.add(f.size)
+            else:
+                self._local_sizes_complete = False
+            
+            # Also index by stem (unless it is the same key, e.g. no extension)
+            if stem != basename:
                 self._local_name_index[stem].append(f)
+        
+        self._local_sha_set = set(self._local_sha256_index)
     
-    def _build_hf_indexes(self):
-        """Build indexes for HuggingFace files."""
-        for f in self.hf_files:
+    def _build_hf_indexes(self, hf_files: Iterable[HFFileInfo]):
+        """Build indexes for HuggingFace files, collecting them in the same pass."""
+        for f in hf_files:
+            self.hf_files.append(f)
+            f._base_lc = basename = sys.intern(f.basename.lower())
+            f._stem_lc = stem = sys.intern(filename_stem(basename))
+            
             if f.sha256:
-                self._hf_sha256_index[f.sha256.lower()] = f
+                self._hf_sha256_index[f.sha256] = f
             
             # Index by basename
-            basename = f.basename.lower()
             self._hf_name_index[basename] = f
             
             # Also index by stem
-            stem = Path(basename).stem
             self._hf_name_index[stem] = f
+        
+        self._hf_sha_set = set(self._hf_sha256_index)
     
-    def compare(self) -> ComparisonSummary:
+    def compare(
+        self,
+        detailed: bool = True,
+        keep_matches: bool = True,
+        keep_name_matches: bool = True
+    ) -> ComparisonSummary:
         """
         Compare all files and return a summary.
         
@@ -129,6 +160,13 @@ class Comparator:
         2. Reports files that exist only on HF (missing locally)
         3. Reports files that exist only locally (not on HF)
         
+        Args:
+            detailed: Build a ComparisonResult for every file. When False, only
+                      the per-status counts are filled in and the result lists stay empty.
+            keep_matches: Build the matches list. When False, matches are only
+                          counted; the other result lists are still filled in.
+            keep_name_matches: Same as keep_matches, for the name_matches_only list.
+        
         Returns:
             ComparisonSummary with detailed results
         """
@@ -137,26 +175,64 @@ class Comparator:
             total_local_files=len(self.local_files)
         )
         
+        # SHA256 matches are resolved with a single set intersection; only the
+        # HF files left over need the slower filename fallback.
+        match_shas = self._hf_sha_set & self._local_sha_set if self.match_by_sha256 else set()
+        
+        # Per-status totals are kept alongside the lists, so the summary counts
+        # never depend on which result lists were built
+        counts = dict.fromkeys(MatchStatus, 0)
+        summary.counts = counts
+        
+        if not detailed:
+            for hf_file in self.hf_files:
+                if hf_file.sha256 in match_shas:
+                    counts[MatchStatus.MATCH] += 1
+                else:
+                    counts[self._match_by_name(hf_file)[0]] += 1
+            return summary
+        
         matched_local_files: Set[str] = set()  # Track which local files were matched
+        unmatched_hf: List[HFFileInfo] = []
         
-        # Check each HF file against local files
         for hf_file in self.hf_files:
-            result = self._compare_hf_file(hf_file)
-            
-            # Track matched local files
-            if result.status in (MatchStatus.MATCH, MatchStatus.MISMATCH, MatchStatus.NAME_MATCH_ONLY):
+            if hf_file.sha256 in match_shas:
+                counts[MatchStatus.MATCH] += 1
+                if not keep_matches:
+                    continue
+                result = self._sha256_match_result(hf_file, self._local_sha256_index[hf_file.sha256])
                 if result.local_path:
                     matched_local_files.add(result.local_path)
+                summary.matches.append(result)
+            else:
+                unmatched_hf.append(hf_file)
+        
+        # One dict lookup picks the result list instead of a chain of enum compares;
+        # statuses whose list isn't wanted are only counted
+        append_for_status = {
+            MatchStatus.MISMATCH: summary.mismatches.append,
+            MatchStatus.MISSING_LOCAL: summary.missing_local.append,
+        }
+        if keep_matches:
+            append_for_status[MatchStatus.MATCH] = summary.matches.append
+        if keep_name_matches:
+            append_for_status[MatchStatus.NAME_MATCH_ONLY] = summary.name_matches_only.append
+        
+        # Check the remaining HF files by filename
+        for hf_file in unmatched_hf:
+            status, local_file = self._match_by_name(hf_file)
+            counts[status] += 1
+            append = append_for_status.get(status)
+            if append is None:
+                continue
+            result = self._name_match_result(hf_file, status, local_file)
+            
+            # Track matched local files (missing results never carry a local path)
+            if result.local_path:
+                matched_local_files.add(result.local_path)
             
             # Add to appropriate list
-            if result.status == MatchStatus.MATCH:
-                summary.matches.append(result)
-            elif result.status == MatchStatus.MISMATCH:
-                summary.mismatches.append(result)
-            elif result.status == MatchStatus.MISSING_LOCAL:
-                summary.missing_local.append(result)
-            elif result.status == MatchStatus.NAME_MATCH_ONLY:
-                summary.name_matches_only.append(result)
+            append(result)
         
         # Find local files that weren't matched to any HF file
         # (These are files you have locally that aren't in the HF repo)
@@ -176,104 +252,130 @@ class Comparator:
         
         return summary
     
-    def _compare_hf_file(self, hf_file: HFFileInfo) -> ComparisonResult:
+    def _sha256_match_result(self, hf_file: HFFileInfo, local_file: LocalFileInfo) -> ComparisonResult:
+        """Build the result for an HF file whose SHA256 exists locally."""
+        return ComparisonResult(
+            filename=hf_file.basename,
+            status=MatchStatus.MATCH,
+            local_sha256=local_file.sha256,
+            remote_sha256=hf_file.given_sha256,
+            local_path=local_file.file_path,
+            remote_path=hf_file.path,
+            local_size=local_file.size,
+            remote_size=hf_file.size,
+            notes="SHA256 match"
+        )
+    
+    def _match_by_name(self, hf_file: HFFileInfo) -> Tuple[MatchStatus, Optional[LocalFileInfo]]:
         """
-        Compare a single HF file against local files.
+        Classify an HF file with no SHA256 match by looking it up by filename.
         
-        Priority:
-        1. Match by SHA256 (exact match)
-        2. Match by filename
+        Returns:
+            Tuple of (status, matched local file or None for MISSING_LOCAL)
         """
-        # Try to match by SHA256 first (most reliable)
-        if self.match_by_sha256 and hf_file.sha256:
-            sha256_lower = hf_file.sha256.lower()
-            if sha256_lower in self._local_sha256_index:
-                local_file = self._local_sha256_index[sha256_lower]
-                return ComparisonResult(
-                    filename=hf_file.basename,
-                    status=MatchStatus.MATCH,
-                    local_sha256=local_file.sha256,
-                    remote_sha256=hf_file.sha256,
-                    local_path=local_file.file_path,
-                    remote_path=hf_file.path,
-                    local_size=local_file.size,
-                    remote_size=hf_file.size,
-                    notes="SHA256 match"
-                )
+        # No local file has this size, so no local file can hold this content
+        size_unseen = (
+            self._local_sizes_complete
+            and hf_file.size is not None
+            and hf_file.size not in self._local_size_set
+        )
         
-        # Try to match by filename
-        if self.match_by_name:
-            basename = hf_file.basename.lower()
-            stem = Path(basename).stem
-            
-            local_matches = self._local_name_index.get(basename, [])
-            if not local_matches:
-                local_matches = self._local_name_index.get(stem, [])
+        # Try to match by filename (without a hash to check, an unseen size settles it)
+        if self.match_by_name and not (size_unseen and not hf_file.sha256):
+            local_file = None
+            if hf_file.size is not None:
+                local_file = self._local_by_size_name.get((hf_file.size, hf_file._base_lc))
+            if local_file is None:
+                local_matches = self._local_name_index.get(hf_file._base_lc, [])
+                if not local_matches and not size_unseen:
+                    local_matches = self._local_name_index.get(hf_file._stem_lc, [])
+                if local_matches:
+                    local_file = local_matches[0]  # Take first match
             
-            if local_matches:
-                local_file = local_matches[0]  # Take first match
-                
+            if local_file is not None:
                 # Check if SHA256 matches
                 if hf_file.sha256 and local_file.sha256:
-                    if hf_file.sha256.lower() == local_file.sha256.lower():
-                        return ComparisonResult(
-                            filename=hf_file.basename,
-                            status=MatchStatus.MATCH,
-                            local_sha256=local_file.sha256,
-                            remote_sha256=hf_file.sha256,
-                            local_path=local_file.file_path,
-                            remote_path=hf_file.path,
-                            local_size=local_file.size,
-                            remote_size=hf_file.size,
-                            notes="SHA256 match (found by name)"
-                        )
-                    else:
-                        return ComparisonResult(
-                            filename=hf_file.basename,
-                            status=MatchStatus.MISMATCH,
-                            local_sha256=local_file.sha256,
-                            remote_sha256=hf_file.sha256,
-                            local_path=local_file.file_path,
-                            remote_path=hf_file.path,
-                            local_size=local_file.size,
-                            remote_size=hf_file.size,
-                            download_url=self._get_download_url(hf_file.path),
-                            visit_url=self._get_visit_url(hf_file.path),
-                            notes="Filename matches but SHA256 differs - possible different version"
-                        )
-                else:
-                    # Name matches but can't verify SHA256
-                    return ComparisonResult(
-                        filename=hf_file.basename,
-                        status=MatchStatus.NAME_MATCH_ONLY,
-                        local_sha256=local_file.sha256,
-                        remote_sha256=hf_file.sha256,
-                        local_path=local_file.file_path,
-                        remote_path=hf_file.path,
-                        local_size=local_file.size,
-                        remote_size=hf_file.size,
-                        notes="Filename matches but SHA256 not available for verification"
+                    # Different sizes can't be the same content, so skip the hash compare
+                    sizes_differ = (
+                        hf_file.size is not None and local_file.size is not None
+                        and hf_file.size != local_file.size
                     )
+                    if not sizes_differ and hf_file.sha256 == local_file.sha256:
+                        return MatchStatus.MATCH, local_file
+                    return MatchStatus.MISMATCH, local_file
+                
+                # Name matches but can't verify SHA256
+                return MatchStatus.NAME_MATCH_ONLY, local_file
         
         # No match found - file is missing locally
+        return MatchStatus.MISSING_LOCAL, None
+    
+    def _name_match_result(
+        self,
+        hf_file: HFFileInfo,
+        status: MatchStatus,
+        local_file: Optional[LocalFileInfo]
+    ) -> ComparisonResult:
+        """Build the result for an HF file from its _match_by_name outcome."""
+        if status == MatchStatus.MATCH:
+            return ComparisonResult(
+                filename=hf_file.basename,
+                status=MatchStatus.MATCH,
+                local_sha256=local_file.sha256,
+                remote_sha256=hf_file.given_sha256,
+                local_path=local_file.file_path,
+                remote_path=hf_file.path,
+                local_size=local_file.size,
+                remote_size=hf_file.size,
+                notes="SHA256 match (found by name)"
+            )
+        
+        if status == MatchStatus.MISMATCH:
+            download_url, visit_url = self._get_urls(hf_file.path)
+            return ComparisonResult(
+                filename=hf_file.basename,
+                status=MatchStatus.MISMATCH,
+                local_sha256=local_file.sha256,
+                remote_sha256=hf_file.given_sha256,
+                local_path=local_file.file_path,
+                remote_path=hf_file.path,
+                local_size=local_file.size,
+                remote_size=hf_file.size,
+                download_url=download_url,
+                visit_url=visit_url,
+                notes="Filename matches but SHA256 differs - possible different version"
+            )
+        
+        if status == MatchStatus.NAME_MATCH_ONLY:
+            return ComparisonResult(
+                filename=hf_file.basename,
+                status=MatchStatus.NAME_MATCH_ONLY,
+                local_sha256=local_file.sha256,
+                remote_sha256=hf_file.given_sha256,
+                local_path=local_file.file_path,
+                remote_path=hf_file.path,
+                local_size=local_file.size,
+                remote_size=hf_file.size,
+                notes="Filename matches but SHA256 not available for verification"
+            )
+        
+        download_url, visit_url = self._get_urls(hf_file.path)
         return ComparisonResult(
             filename=hf_file.basename,
             status=MatchStatus.MISSING_LOCAL,
-            remote_sha256=hf_file.sha256,
+            remote_sha256=hf_file.given_sha256,
             remote_path=hf_file.path,
             remote_size=hf_file.size,
-            download_url=self._get_download_url(hf_file.path),
-            visit_url=self._get_visit_url(hf_file.path),
+            download_url=download_url,
+            visit_url=visit_url,
             notes="File not found in local metadata"
         )
     
     def find_local_file_by_hf_file(self, hf_file: HFFileInfo) -> Optional[LocalFileInfo]:
         """Find a local file that matches a HF file."""
         # Try SHA256 first
-        if hf_file.sha256:
-            sha256_lower = hf_file.sha256.lower()
-            if sha256_lower in self._local_sha256_index:
-                return self._local_sha256_index[sha256_lower]
+        if hf_file.sha256 and hf_file.sha256 in self._local_sha256_index:
+            return self._local_sha256_index[hf_file.sha256]
         
         # Try by name
         basename = hf_file.basename.lower()
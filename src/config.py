@@ -5,11 +5,29 @@ Stores user settings like local directories in a JSON config file.
 
 import os
 import json
+import atexit
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass, field, asdict
+from typing import Iterator, List, Dict, Optional, Any
+from dataclasses import dataclass, field
 from datetime import datetime
 
+# orjson is optional; it reads/writes UTF-8 bytes directly and is much faster
+try:
+    import orjson
+    
+    def _loads(data: bytes) -> Any:
+        return orjson.loads(data)
+    
+    def _dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+except ImportError:
+    def _loads(data: bytes) -> Any:
+        return json.loads(data)
+    
+    def _dumps(obj: Any) -> bytes:
+        return json.dumps(obj, indent=2).encode('utf-8')
+
 
 def get_config_dir() -> Path:
     """Get the configuration directory path."""
@@ -38,12 +56,15 @@ class DirectoryConfig:
     extensions: List[str] = field(default_factory=lambda: ['.safetensors', '.ckpt', '.pt', '.bin'])
     enabled: bool = True
     added: str = ""  # ISO timestamp
+    _resolved: Optional[Path] = field(default=None, init=False, repr=False, compare=False)  # Cached Path.resolve()
     
     def __post_init__(self):
         if not self.name:
             self.name = Path(self.path).name
         if not self.added:
             self.added = datetime.now().isoformat()
+        # resolve() hits the filesystem, so do it once instead of on every lookup
+        self._resolved = Path(self.path).resolve()
 
 
 @dataclass 
@@ -63,10 +84,26 @@ class Config:
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for JSON serialization."""
+        # Fields are flat, so read them directly instead of going through asdict()'s deep copy
+        server = self.server
         return {
             'version': self.version,
-            'server': asdict(self.server),
-            'directories': [asdict(d) for d in self.directories]
+            'server': {
+                'port': server.port,
+                'host': server.host,
+                'auto_scan_on_start': server.auto_scan_on_start
+            },
+            'directories': [
+                {
+                    'path': d.path,
+                    'name': d.name,
+                    'scan_mode': d.scan_mode,
+                    'extensions': list(d.extensions),
+                    'enabled': d.enabled,
+                    'added': d.added
+                }
+                for d in self.directories
+            ]
         }
     
     @classmethod
@@ -92,6 +129,9 @@ class ConfigManager:
     def __init__(self, config_path: Optional[Path] = None):
         self.config_path = config_path or get_config_path()
         self._config: Optional[Config] = None
+        # Mutators only mark the config dirty; flush() writes it out once
+        self._dirty = False
+        atexit.register(self.flush)
     
     @property
     def config(self) -> Config:
@@ -104,8 +144,8 @@ class ConfigManager:
         """Load config from disk."""
         try:
             if self.config_path.exists():
-                with open(self.config_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(self.config_path, 'rb') as f:
+                    data = _loads(f.read())
                 return Config.from_dict(data)
         except Exception as e:
             print(f"Warning: Could not load config: {e}")
@@ -116,13 +156,41 @@ class ConfigManager:
         """Save config to disk."""
         try:
             self.config_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.config_path, 'w', encoding='utf-8') as f:
-                json.dump(self.config.to_dict(), f, indent=2)
+            # Serialize up front and write once; json.dump streams many small writes
+            data = _dumps(self.config.to_dict())
+            # Write a sibling temp file and swap it in, so a crash mid-write
+            # can never leave a truncated config behind
+            tmp_path = self.config_path.with_name(self.config_path.name + '.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, self.config_path)
+            self._dirty = False
             return True
         except Exception as e:
             print(f"Error saving config: {e}")
             return False
     
+    def flush(self) -> bool:
+        """Save config to disk if it has unsaved changes."""
+        if not self._dirty:
+            return True
+        return self.save()
+    
+    @contextmanager
+    def batch(self) -> Iterator['ConfigManager']:
+        """
+        Group several changes into a single write.
+        
+        Example:
+            with config_manager.batch():
+                for path in paths:
+                    config_manager.set_directory_enabled(path, False)
+        """
+        try:
+            yield self
+        finally:
+            self.flush()
+    
     def add_directory(
         self, 
         path: str, 
@@ -132,18 +200,19 @@ class ConfigManager:
     ) -> DirectoryConfig:
         """Add a new directory to the config."""
         # Normalize path
-        path = str(Path(path).resolve())
+        resolved = Path(path).resolve()
+        path = str(resolved)
         
         # Check if already exists
         for d in self.config.directories:
-            if Path(d.path).resolve() == Path(path).resolve():
+            if d._resolved == resolved:
                 # Update existing
                 d.name = name or d.name
                 d.scan_mode = scan_mode
                 if extensions:
                     d.extensions = extensions
                 d.enabled = True
-                self.save()
+                self._dirty = True
                 return d
         
         # Create new
@@ -154,19 +223,19 @@ class ConfigManager:
             extensions=extensions or ['.safetensors', '.ckpt', '.pt', '.bin']
         )
         self.config.directories.append(dir_config)
-        self.save()
+        self._dirty = True
         return dir_config
     
     def remove_directory(self, path: str) -> bool:
         """Remove a directory from the config."""
-        path = str(Path(path).resolve())
+        resolved = Path(path).resolve()
         original_len = len(self.config.directories)
         self.config.directories = [
             d for d in self.config.directories 
-            if Path(d.path).resolve() != Path(path).resolve()
+            if d._resolved != resolved
         ]
         if len(self.config.directories) < original_len:
-            self.save()
+            self._dirty = True
             return True
         return False
     
@@ -176,11 +245,11 @@ class ConfigManager:
     
     def set_directory_enabled(self, path: str, enabled: bool) -> bool:
         """Enable or disable a directory."""
-        path = str(Path(path).resolve())
+        resolved = Path(path).resolve()
         for d in self.config.directories:
-            if Path(d.path).resolve() == Path(path).resolve():
+            if d._resolved == resolved:
                 d.enabled = enabled
-                self.save()
+                self._dirty = True
                 return True
         return False
 
@@ -1,15 +1,34 @@
 """HuggingFace API - fetching file lists, parsing URLs."""
 
-from typing import List, Optional, Tuple, Literal
+from typing import Iterator, List, Optional, Tuple, Literal
 from huggingface_hub import HfApi, list_repo_tree, hf_hub_url
 from huggingface_hub.hf_api import RepoFile
+import queue
 import re
+import threading
 
 from models import HFFileInfo
 
 # Valid HuggingFace repository types
 RepoType = Literal["model", "dataset", "space"]
 
+# Single pattern for every supported HF URL format, compiled once:
+# - huggingface.co/user/repo
+# - huggingface.co/user/repo/tree/<revision>[/...] (or blob)
+# - the same with a datasets/ or spaces/ prefix
+_URL_PATTERN = re.compile(
+    r"huggingface\.co/(?:(?:datasets|spaces)/)?(?P<repo_id>[^/]+/[^/]+)"
+    r"(?:/(?:tree|blob)/(?P<revision>[^/]+)(?:/.*)?|/?)$"
+)
+
+# Well-formed URLs start with one of these and can skip the regex
+_URL_PREFIXES = ("https://huggingface.co/", "http://huggingface.co/")
+
+# Tree listing prefetch: items are handed over in batches, with a few batches buffered
+_PREFETCH_BATCH_SIZE = 256
+_PREFETCH_MAX_BATCHES = 8
+_PREFETCH_DONE = object()
+
 
 class HuggingFaceClient:
     """Client to fetch file information from HuggingFace repositories"""
@@ -73,63 +92,136 @@ class HuggingFaceClient:
         elif "/spaces/" in url:
             repo_type = "space"
         
-        # Pattern for various HF URL formats
-        # For datasets/spaces: huggingface.co/datasets/user/repo or huggingface.co/spaces/user/repo
-        patterns = [
-            # datasets/spaces tree/blob URLs with branch
-            r"huggingface\.co/(?:datasets|spaces)/([^/]+/[^/]+)/(?:tree|blob)/([^/]+)",
-            # datasets/spaces direct repo URL
-            r"huggingface\.co/(?:datasets|spaces)/([^/]+/[^/]+)/?$",
-            # model tree/blob URLs with branch
-            r"huggingface\.co/([^/]+/[^/]+)/(?:tree|blob)/([^/]+)",
-            # model direct repo URL
-            r"huggingface\.co/([^/]+/[^/]+)/?$",
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, url)
-            if match:
-                repo_id = match.group(1)
-                revision = match.group(2) if len(match.groups()) > 1 and match.group(2) else "main"
-                return repo_id, revision, repo_type
+        # Fast path: plain split for the common, well-formed URLs
+        parsed = HuggingFaceClient._split_url(url)
+        if parsed:
+            return parsed[0], parsed[1], repo_type
+        
+        match = _URL_PATTERN.search(url)
+        if match:
+            return match.group("repo_id"), match.group("revision") or "main", repo_type
         
         raise ValueError(f"Could not parse HuggingFace URL: {url}")
     
-    def fetch_all_files(self, path: str = "", recursive: bool = True) -> List[HFFileInfo]:
+    @staticmethod
+    def _split_url(url: str) -> Optional[Tuple[str, str]]:
         """
-        Fetch all files from the repository with their metadata.
+        Extract (repo_id, revision) from a well-formed HF URL without regex.
+        
+        Returns None for anything unusual so parse_url can fall back to the regex.
+        """
+        for prefix in _URL_PREFIXES:
+            if url.startswith(prefix):
+                segments = url[len(prefix):].split("/")
+                break
+        else:
+            return None
+        
+        if segments[0] in ("datasets", "spaces"):
+            segments = segments[1:]
+        if len(segments) < 2 or not segments[0] or not segments[1]:
+            return None
+        
+        repo_id = f"{segments[0]}/{segments[1]}"
+        if len(segments) == 2:
+            return repo_id, "main"
+        if len(segments) >= 4 and segments[2] in ("tree", "blob") and segments[3]:
+            return repo_id, segments[3]
+        return None
+    
+    def iter_all_files(self, path: str = "", recursive: bool = True) -> Iterator[HFFileInfo]:
+        """
+        Yield files from the repository with their metadata as they are listed.
         
         Args:
             path: Subdirectory path to start from (empty for root)
             recursive: Whether to recursively fetch all files
             
-        Returns:
-            List of HFFileInfo objects
+        Yields:
+            HFFileInfo objects
         """
-        files = []
-        
         try:
-            # Use list_repo_tree to get all files recursively
-            repo_files = list_repo_tree(
-                repo_id=self.repo_id,
-                revision=self.revision,
-                path_in_repo=path if path else None,
-                recursive=recursive,
-                token=self.token,
-                repo_type=self.repo_type
-            )
-            
-            for item in repo_files:
-                # Only process files (not directories)
-                if isinstance(item, RepoFile):
-                    file_info = self._parse_repo_file(item)
-                    if file_info:
-                        files.append(file_info)
+            for batch in self._prefetch_tree(path, recursive):
+                for item in batch:
+                    # Only process files (not directories)
+                    if isinstance(item, RepoFile):
+                        file_info = self._parse_repo_file(item)
+                        if file_info:
+                            yield file_info
                         
         except Exception as e:
             raise RuntimeError(f"Failed to fetch files from {self.repo_id}: {e}")
+    
+    def _prefetch_tree(self, path: str, recursive: bool) -> Iterator[list]:
+        """
+        Iterate list_repo_tree in a background thread and yield its items in batches.
+        
+        The tree listing is paginated over HTTP, so fetching the next pages while
+        the caller parses and indexes the current ones hides most of that latency.
+        Errors raised by the listing are re-raised in the caller's thread.
+        """
+        batches: queue.Queue = queue.Queue(maxsize=_PREFETCH_MAX_BATCHES)
+        stop = threading.Event()
+        
+        def put(item) -> bool:
+            # Give up if the consumer went away instead of blocking forever
+            while not stop.is_set():
+                try:
+                    batches.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
         
-        return files
+        def producer():
+            try:
+                # Use list_repo_tree to get all files recursively
+                repo_files = list_repo_tree(
+                    repo_id=self.repo_id,
+                    revision=self.revision,
+                    path_in_repo=path if path else None,
+                    recursive=recursive,
+                    token=self.token,
+                    repo_type=self.repo_type
+                )
+                batch = []
+                for item in repo_files:
+                    batch.append(item)
+                    if len(batch) >= _PREFETCH_BATCH_SIZE:
+                        if not put(batch):
+                            return
+                        batch = []
+                if batch and not put(batch):
+                    return
+                put(_PREFETCH_DONE)
+            except Exception as e:
+                put(e)
+        
+        thread = threading.Thread(target=producer, name="hf-tree-prefetch", daemon=True)
+        thread.start()
+        try:
+            while True:
+                batch = batches.get()
+                if batch is _PREFETCH_DONE:
+                    return
+                if isinstance(batch, Exception):
+                    raise batch
+                yield batch
+        finally:
+            stop.set()
+    
+    def fetch_all_files(self, path: str = "", recursive: bool = True) -> List[HFFileInfo]:
+        """
+        Fetch all files from the repository with their metadata.
+        
+        Args:
+            path: Subdirectory path to start from (empty for root)
+            recursive: Whether to recursively fetch all files
+            
+        Returns:
+            List of HFFileInfo objects
+        """
+        return list(self.iter_all_files(path=path, recursive=recursive))
     
     def fetch_safetensors_only(self, path: str = "") -> List[HFFileInfo]:
         """
@@ -141,8 +233,7 @@ class HuggingFaceClient:
         Returns:
             List of HFFileInfo objects for safetensors files
         """
-        all_files = self.fetch_all_files(path=path, recursive=True)
-        return [f for f in all_files if f.filename.endswith(".safetensors")]
+        return [f for f in self.iter_all_files(path=path, recursive=True) if f.filename.endswith(".safetensors")]
     
     def _parse_repo_file(self, repo_file: RepoFile) -> Optional[HFFileInfo]:
         """
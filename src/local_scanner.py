@@ -7,16 +7,256 @@ Can also scan actual model files directly and calculate their SHA256 hashes
 """
 
 import os
+import sys
 import json
 import hashlib
+import mmap
 import sqlite3
-from typing import List, Optional, Dict, Any, Tuple, Callable
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import partial
+from typing import Iterable, Iterator, List, Optional, Dict, Any, Tuple, Callable, Union
 from pathlib import Path
 from dataclasses import dataclass, field
 from datetime import datetime
 from rich.progress import Progress, BarColumn, TextColumn, TimeRemainingColumn, TaskProgressColumn, SpinnerColumn
 
-from models import LocalFileInfo
+from models import LocalFileInfo, filename_stem
+
+# orjson is optional; it parses small metadata files several times faster
+try:
+    import orjson
+    _json_loads = orjson.loads
+    _FAST_DECODE_ERRORS = (orjson.JSONDecodeError,)
+except ImportError:
+    _json_loads = json.loads
+    _FAST_DECODE_ERRORS = ()
+
+# msgspec is optional too; when present, metadata files are decoded against the
+# handful of keys the scanner reads and every other key (tag lists, trigger
+# words, civitai blobs...) is skipped without building Python objects for it
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+if msgspec is not None:
+    class _MetadataFields(msgspec.Struct):
+        """Metadata keys read by LocalScanner; types are left open like a plain dict's."""
+        file_name: Any = ''
+        sha256: Any = None
+        file_path: Any = None
+        size: Any = None
+        model_name: Any = None
+        base_model: Any = None
+        
+        def get(self, key: str, default: Any = None) -> Any:
+            # Same lookups as on the json dict (field defaults match the callers')
+            return getattr(self, key, default)
+    
+    _metadata_loads = msgspec.json.Decoder(
+        Union[_MetadataFields, List[_MetadataFields]]
+    ).decode
+    _FAST_DECODE_ERRORS = (msgspec.DecodeError,)
+else:
+    _metadata_loads = _json_loads
+
+
+def _load_metadata(raw) -> Any:
+    """Decode metadata JSON with the fast parser, falling back to the json module."""
+    try:
+        return _metadata_loads(raw)
+    except _FAST_DECODE_ERRORS:
+        # NaN/Infinity literals (what json.dump writes for float NaN) are
+        # rejected by the fast parsers but accepted by the json module
+        return json.loads(bytes(raw))
+
+
+# Metadata files at least this big are parsed straight from an mmap (with orjson or msgspec).
+# Below it, mapping/unmapping costs more than the copy read() makes.
+MMAP_MIN_SIZE = 1024 * 1024
+
+# Read buffer used when hashing model files
+HASH_CHUNK_SIZE = 4 * 1024 * 1024
+
+# Model files at least this large are hashed from a read-only memory map
+MMAP_HASH_MIN_SIZE = 64 * 1024 * 1024
+
+# When a worker starts hashing a file, the kernel is asked to start reading the
+# first READAHEAD_BYTES of the file queued max_workers + READAHEAD_FILES places
+# behind it. The other workers pick up the files right behind it at about the
+# same time, so the prefetch reaches past them to the next READAHEAD_FILES
+# files (posix_fadvise WILLNEED; Linux and other POSIX systems only)
+READAHEAD_FILES = 4
+READAHEAD_BYTES = 32 * 1024 * 1024
+
+# hashlib.file_digest was added in Python 3.11
+_HAVE_FILE_DIGEST = hasattr(hashlib, 'file_digest')
+
+
+def _select_sha256_factory() -> Callable[[], Any]:
+    """
+    Pick the SHA-256 constructor once at import.
+    
+    hashlib.sha256 is OpenSSL's EVP implementation whenever Python is built
+    against OpenSSL, which uses SHA-NI / ARMv8 SHA2 instructions when the CPU
+    has them. usedforsecurity=False (Python 3.9+) keeps it usable on FIPS builds,
+    since these hashes only identify files.
+    """
+    try:
+        hashlib.sha256(usedforsecurity=False)
+    except TypeError:
+        return hashlib.sha256
+    return partial(hashlib.sha256, usedforsecurity=False)
+
+
+_SHA256_FACTORY = _select_sha256_factory()
+
+
+# Threads used to list directories ahead of the walk (scandir/stat release the GIL)
+WALK_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def _readahead(path: str):
+    """Start reading the beginning of a file into the page cache in the background."""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        # Pages requested with WILLNEED stay cached after the descriptor is closed
+        os.posix_fadvise(fd, 0, READAHEAD_BYTES, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _extension_matcher(extensions: List[str]) -> Callable[[str], bool]:
+    """Build a case-insensitive file-name filter for the given extensions."""
+    # Match on the part after the last dot with one set lookup. Multi-part
+    # extensions (e.g. ".tar.gz") can't be matched that way, so those fall back
+    # to str.endswith, which checks a whole tuple in one C call.
+    ext_tuple = tuple(ext.lower() for ext in extensions)
+    ext_set = frozenset(ext.lstrip('.') for ext in ext_tuple)
+    if any('.' in ext for ext in ext_set):
+        return lambda name: name.lower().endswith(ext_tuple)
+    
+    def match(name: str) -> bool:
+        i = name.rfind('.')
+        return i >= 0 and name[i + 1:].lower() in ext_set
+    return match
+
+
+def _dir_key(path: str) -> Any:
+    """
+    Identify a directory for symlink-loop detection.
+    
+    (st_dev, st_ino) takes one stat instead of the lstat per path component
+    realpath needs, and also catches bind mounts. Filesystems that don't report
+    inode numbers (st_ino == 0, e.g. some network shares) fall back to realpath.
+    """
+    try:
+        st = os.stat(path)
+    except OSError:
+        return os.path.realpath(path)
+    if st.st_ino:
+        return (st.st_dev, st.st_ino)
+    return os.path.realpath(path)
+
+
+def _list_dir(
+    current: str,
+    match: Callable[[str], bool]
+) -> Tuple[str, List[str], List[Tuple[str, Optional[os.stat_result]]]]:
+    """
+    List one directory for _walk_files.
+    
+    Returns:
+        (identity of the directory, subdirectory paths, matching (path, stat) pairs)
+    """
+    dir_key = _dir_key(current)
+    subdirs = []
+    files = []
+    try:
+        with os.scandir(current) as it:
+            entries = list(it)
+    except OSError:
+        return dir_key, subdirs, files
+    
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir()
+        except OSError:
+            is_dir = False
+        if is_dir:
+            subdirs.append(entry.path)
+        elif match(entry.name):
+            try:
+                stat = entry.stat()
+            except OSError:
+                stat = None
+            files.append((entry.path, stat))
+    return dir_key, subdirs, files
+
+
+def _walk_files(
+    root: str,
+    extensions: List[str],
+    workers: Optional[int] = None
+) -> Iterator[Tuple[str, Optional[os.stat_result]]]:
+    """
+    Recursively yield (path, stat) for files under root with a matching extension.
+    
+    Walks with os.scandir in the same order as os.walk(followlinks=True), but
+    takes each file's stat from its DirEntry (filled in by the directory listing
+    on Windows, cached per entry elsewhere) instead of a separate path.stat().
+    Directories reached again through symlinks are only scanned once.
+    stat is None if the file could not be stat'ed (e.g. a broken symlink).
+    
+    With more than one worker, subdirectories are listed on a thread pool as
+    soon as their parent has been read, so on network drives and cold caches
+    many listings are in flight at once. Results are still consumed (and
+    yielded) in walk order.
+    
+    Args:
+        root: Directory to walk
+        extensions: File extensions to match (case-insensitive)
+        workers: Listing threads (default: WALK_WORKERS; 1 lists inline)
+    """
+    match = _extension_matcher(extensions)
+    if workers is None:
+        workers = WALK_WORKERS
+    executor = ThreadPoolExecutor(max_workers=workers) if workers > 1 else None
+    
+    def schedule(path: str):
+        if executor is None:
+            return path
+        return executor.submit(_list_dir, path, match)
+    
+    visited_dirs = set()
+    stack = [schedule(root)]
+    try:
+        while stack:
+            item = stack.pop()
+            if executor is None:
+                dir_key, subdirs, files = _list_dir(item, match)
+            else:
+                dir_key, subdirs, files = item.result()
+            
+            # Checked in walk order, so the result doesn't depend on listing timing
+            if dir_key in visited_dirs:
+                continue
+            visited_dirs.add(dir_key)
+            
+            yield from files
+            
+            # Reversed so subdirectories are popped in listing order
+            stack.extend(schedule(d) for d in reversed(subdirs))
+    finally:
+        if executor is not None:
+            for item in stack:
+                item.cancel()
+            executor.shutdown(wait=False)
 
 
 # SQLite-based cache
@@ -25,14 +265,56 @@ class SQLiteMetadataCache:
     
     SCHEMA_VERSION = 1
     
+    # Column order shared by the file_cache SELECTs and row_file_info
+    _ENTRY_COLUMNS = (
+        "file_path, mtime, size, file_name, sha256, model_name, base_model, "
+        "actual_file_path, metadata_path, file_size"
+    )
+    _SELECT_ENTRY_SQL = f"SELECT {_ENTRY_COLUMNS} FROM file_cache WHERE file_path = ?"
+    _INSERT_SQL = """
+        INSERT OR REPLACE INTO file_cache 
+        (file_path, mtime, size, file_name, sha256, model_name, base_model, actual_file_path, metadata_path, file_size)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+    
+    # Buffered set_entry rows are written once this many are queued
+    FLUSH_THRESHOLD = 500
+    
     def __init__(self, cache_path: Path, directory: str):
         self.cache_path = cache_path
         self.directory = directory
+        # One connection for the cache's lifetime instead of one per call
+        self._conn = sqlite3.connect(str(cache_path))
+        self._pending: List[tuple] = []
         self._ensure_schema()
     
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except:
+            pass
+    
     def _ensure_schema(self):
         """Create tables if they don't exist."""
-        with sqlite3.connect(str(self.cache_path)) as conn:
+        conn = self._conn
+        # The cache can always be rebuilt, so trade durability for speed. page_size
+        # only applies to a new database, so it is set before the tables exist.
+        # WAL is left off: the cache sits in the model directory, which may be a
+        # network share, and WAL's shared-memory index doesn't work there.
+        conn.executescript("""
+            PRAGMA page_size = 8192;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA temp_store = MEMORY;
+            PRAGMA cache_size = -64000;
+            PRAGMA mmap_size = 268435456;
+        """)
+        with conn:
             conn.executescript("""
                 CREATE TABLE IF NOT EXISTS cache_meta (
                     key TEXT PRIMARY KEY,
@@ -54,86 +336,148 @@ class SQLiteMetadataCache:
                 
                 CREATE INDEX IF NOT EXISTS idx_sha256 ON file_cache(sha256);
             """)
-            conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('directory', ?)", (self.directory,))
-            conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('version', ?)", (str(self.SCHEMA_VERSION),))
-            conn.commit()
+            # Only write the meta rows when they change, so opening a warm cache is read-only
+            meta = dict(conn.execute("SELECT key, value FROM cache_meta"))
+            if meta.get('directory') != self.directory or meta.get('version') != str(self.SCHEMA_VERSION):
+                conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('directory', ?)", (self.directory,))
+                conn.execute("INSERT OR REPLACE INTO cache_meta (key, value) VALUES ('version', ?)", (str(self.SCHEMA_VERSION),))
     
     def is_valid_for_directory(self, directory: str) -> bool:
         """Check if cache is valid for the given directory."""
         try:
-            with sqlite3.connect(str(self.cache_path)) as conn:
-                cursor = conn.execute("SELECT value FROM cache_meta WHERE key = 'directory'")
-                row = cursor.fetchone()
-                return row and row[0] == directory
+            cursor = self._conn.execute("SELECT value FROM cache_meta WHERE key = 'directory'")
+            row = cursor.fetchone()
+            return row and row[0] == directory
         except:
             return False
     
+    @staticmethod
+    def row_file_info(row: tuple) -> Optional[LocalFileInfo]:
+        """Build the LocalFileInfo stored in a positional file_cache row (None if empty)."""
+        (_, _, _, file_name, sha256, model_name, base_model,
+         actual_file_path, metadata_path, file_size) = row
+        if not (file_name or sha256):
+            return None
+        return LocalFileInfo(
+            file_name=file_name or '',
+            sha256=sha256,
+            file_path=actual_file_path,
+            size=file_size,
+            model_name=model_name,
+            base_model=base_model,
+            metadata_path=metadata_path or ''
+        )
+    
     def get_entry(self, file_path: str) -> Optional[Tuple[float, int, Optional[LocalFileInfo]]]:
         """Get cached entry for a file path."""
         try:
-            with sqlite3.connect(str(self.cache_path)) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.execute("SELECT * FROM file_cache WHERE file_path = ?", (file_path,))
-                row = cursor.fetchone()
-                if not row:
-                    return None
-                
-                file_info = None
-                if row['file_name'] or row['sha256']:
-                    file_info = LocalFileInfo(
-                        file_name=row['file_name'] or '',
-                        sha256=row['sha256'],
-                        file_path=row['actual_file_path'],
-                        size=row['file_size'],
-                        model_name=row['model_name'],
-                        base_model=row['base_model'],
-                        metadata_path=row['metadata_path'] or ''
-                    )
-                return (row['mtime'], row['size'], file_info)
+            # Same SQL text every call, so sqlite3's statement cache reuses the prepared query
+            cursor = self._conn.execute(self._SELECT_ENTRY_SQL, (file_path,))
+            row = cursor.fetchone()
+            if not row:
+                return None
+            return (row[1], row[2], self.row_file_info(row))
         except:
             return None
     
+    def load_all(self) -> Dict[str, tuple]:
+        """
+        Load every cache entry in a single query.
+        
+        Scanners look up thousands of paths per run; one bulk read replaces a
+        connection and a query per file. Rows are kept as the flat tuples SQLite
+        returns, and only rows that turn out to be cache hits are turned into
+        LocalFileInfo objects (see row_file_info), so stale or changed entries
+        never cost an object.
+        
+        Returns:
+            Dict mapping file path to its row (file_path, mtime, size, ...)
+        """
+        try:
+            cursor = self._conn.execute(f"SELECT {self._ENTRY_COLUMNS} FROM file_cache")
+            return {row[0]: row for row in cursor}
+        except:
+            return {}
+    
+    @staticmethod
+    def _entry_params(file_path: str, mtime: float, size: int, file_info: Optional[LocalFileInfo]) -> tuple:
+        """Build the INSERT parameters for one cache entry."""
+        return (
+            file_path, mtime, size,
+            file_info.file_name if file_info else None,
+            file_info.sha256 if file_info else None,
+            file_info.model_name if file_info else None,
+            file_info.base_model if file_info else None,
+            file_info.file_path if file_info else None,
+            file_info.metadata_path if file_info else None,
+            file_info.size if file_info else None,
+        )
+    
     def set_entry(self, file_path: str, mtime: float, size: int, file_info: Optional[LocalFileInfo]):
-        """Store or update a cache entry."""
+        """
+        Queue a cache entry for storage.
+        
+        Entries are written in batches of FLUSH_THRESHOLD, so a long hashing run
+        keeps its progress without a commit per file. Call flush() (or close())
+        to write the rest.
+        """
+        self._pending.append(self._entry_params(file_path, mtime, size, file_info))
+        if len(self._pending) >= self.FLUSH_THRESHOLD:
+            self.flush()
+    
+    def write_changes(
+        self,
+        entries: List[Tuple[str, float, int, Optional[LocalFileInfo]]],
+        stale_paths: Iterable[str] = ()
+    ):
+        """
+        Store new/updated entries and delete stale ones in one transaction.
+        
+        Entries queued by set_entry are written along with them. Nothing is
+        written when there are no changes (the common warm-cache run), and a
+        crash mid-write can't leave a half-updated cache.
+        """
+        rows = self._pending + [self._entry_params(*e) for e in entries]
+        self._pending = []
+        stale = [(p,) for p in stale_paths]
+        if not rows and not stale:
+            return
         try:
-            with sqlite3.connect(str(self.cache_path)) as conn:
-                conn.execute("""
-                    INSERT OR REPLACE INTO file_cache 
-                    (file_path, mtime, size, file_name, sha256, model_name, base_model, actual_file_path, metadata_path, file_size)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    file_path, mtime, size,
-                    file_info.file_name if file_info else None,
-                    file_info.sha256 if file_info else None,
-                    file_info.model_name if file_info else None,
-                    file_info.base_model if file_info else None,
-                    file_info.file_path if file_info else None,
-                    file_info.metadata_path if file_info else None,
-                    file_info.size if file_info else None,
-                ))
-                conn.commit()
+            with self._conn:
+                if rows:
+                    self._conn.executemany(self._INSERT_SQL, rows)
+                if stale:
+                    self._conn.executemany("DELETE FROM file_cache WHERE file_path = ?", stale)
         except:
             pass
     
+    def flush(self):
+        """Write entries queued by set_entry."""
+        self.write_changes([])
+    
+    def close(self):
+        """Flush queued entries and close the connection."""
+        if self._conn is None:
+            return
+        self.flush()
+        self._conn.close()
+        self._conn = None
+    
     def cleanup_stale(self, valid_paths: set):
-        """Remove entries for files that no longer exist."""
+        """Remove entries for files that no longer exist (and write queued entries)."""
         try:
-            with sqlite3.connect(str(self.cache_path)) as conn:
-                cursor = conn.execute("SELECT file_path FROM file_cache")
-                all_paths = [row[0] for row in cursor.fetchall()]
-                stale = [p for p in all_paths if p not in valid_paths]
-                if stale:
-                    conn.executemany("DELETE FROM file_cache WHERE file_path = ?", [(p,) for p in stale])
-                    conn.commit()
+            cursor = self._conn.execute("SELECT file_path FROM file_cache")
+            stale = [row[0] for row in cursor if row[0] not in valid_paths]
         except:
-            pass
+            return
+        self.write_changes([], stale)
     
     def clear(self):
         """Clear all cache entries."""
+        self._pending = []
         try:
-            with sqlite3.connect(str(self.cache_path)) as conn:
-                conn.execute("DELETE FROM file_cache")
-                conn.commit()
+            with self._conn:
+                self._conn.execute("DELETE FROM file_cache")
         except:
             pass
 
@@ -156,10 +500,18 @@ class LocalScanner:
             raise ValueError(f"Directory does not exist: {directory}")
         
         self.use_cache = use_cache
-        self._metadata_files: List[Path] = []
+        self._metadata_files: List[str] = []
         self._local_files: List[LocalFileInfo] = []
         self._cache: Optional[SQLiteMetadataCache] = None
         self._cache_path = self.directory / self.CACHE_FILENAME
+        self._cache_rows: Dict[str, tuple] = {}
+        self._pending_entries: List[Tuple[str, float, int, Optional[LocalFileInfo]]] = []
+        # Lookup indexes, kept up to date while scanning
+        self._sha256_index: Dict[str, LocalFileInfo] = {}
+        self._filename_index: Dict[str, List[LocalFileInfo]] = {}
+        # Positions in _local_files for get_by_filename, by exact name and by stem
+        self._name_rows: Dict[str, List[int]] = {}
+        self._stem_rows: Dict[str, List[int]] = {}
         
         # Stats
         self._stats = {
@@ -186,6 +538,10 @@ class LocalScanner:
         
         self._metadata_files = []
         self._local_files = []
+        self._sha256_index = {}
+        self._filename_index = {}
+        self._name_rows = {}
+        self._stem_rows = {}
         self._stats = {'cache_hits': 0, 'cache_misses': 0, 'files_scanned': 0, 'parse_errors': 0}
         
         # Load/create cache if enabled
@@ -199,69 +555,67 @@ class LocalScanner:
         else:
             self._cache = None
         
+        # Read the whole cache once; new entries are written back in one batch
+        self._cache_rows = self._cache.load_all() if self._cache else {}
+        self._pending_entries = []
+        
         # Find all JSON files
-        visited_dirs = set()
-        for root, dirs, files in os.walk(self.directory, followlinks=True):
-            
-            real_root = os.path.realpath(root)
-            if real_root in visited_dirs:
-                dirs[:] = []  
-                continue
-            visited_dirs.add(real_root)
-            
-            for file in files:
-                if any(file.lower().endswith(ext) for ext in extensions):
-                    self._metadata_files.append(Path(root) / file)
+        found = list(_walk_files(str(self.directory), extensions))
+        self._metadata_files = [p for p, _ in found]
         
         self._stats['files_scanned'] = len(self._metadata_files)
         
-        # Parse each JSON file (using cache when possible)
-        for meta_path in self._metadata_files:
-            file_info = self._get_file_info_cached(meta_path)
+        # Parse each JSON file (using cache when possible). Cache hits are decided
+        # from the walk's stat alone, so an unchanged file is never opened.
+        cache_rows = self._cache_rows  # Empty when caching is disabled
+        for path_str, stat in found:
+            if stat is None:
+                continue  # Could not be stat'ed (e.g. broken symlink)
+            
+            # Rows are (file_path, mtime, size, ...)
+            row = cache_rows.get(path_str)
+            if row and row[1] == stat.st_mtime and row[2] == stat.st_size:
+                self._stats['cache_hits'] += 1
+                file_info = SQLiteMetadataCache.row_file_info(row)
+            else:
+                file_info = self._parse_and_cache(path_str, stat)
+            
             if file_info:
-                self._local_files.append(file_info)
+                self._add_local_file(file_info)
         
-        # Clean up cache (remove entries for deleted files)
-        self._cleanup_cache()
+        # Save new entries and remove entries for deleted files
+        self._save_cache()
         
         return self._local_files
     
-    def _get_file_info_cached(self, path: Path) -> Optional[LocalFileInfo]:
-        """Get file info, using cache if available and valid."""
-        path_str = str(path)
-        
-        try:
-            stat = path.stat()
-            current_mtime = stat.st_mtime
-            current_size = stat.st_size
-        except OSError:
-            return None
-        
-        # Check cache
-        if self._cache:
-            cached = self._cache.get_entry(path_str)
-            if cached:
-                cached_mtime, cached_size, cached_info = cached
-                
-                if cached_mtime == current_mtime and cached_size == current_size:
-                    self._stats['cache_hits'] += 1
-                    return cached_info
+    def _parse_and_cache(self, path: str, stat: os.stat_result) -> Optional[LocalFileInfo]:
+        """
+        Parse a metadata file that missed the cache and queue it for the cache.
         
-        # Cache miss - need to parse
+        Args:
+            path: Metadata file path
+            stat: The file's stat from the directory walk
+        """
         self._stats['cache_misses'] += 1
         file_info = self._parse_metadata_file(path)
         
-        # Store in cache
+        # Queue for the cache (written in one batch at the end of scan())
         if self._cache:
-            self._cache.set_entry(path_str, current_mtime, current_size, file_info)
+            self._pending_entries.append((path, stat.st_mtime, stat.st_size, file_info))
         
         return file_info
     
-    def _parse_metadata_file(self, path: Path) -> Optional[LocalFileInfo]:
+    def _parse_metadata_file(self, path: str) -> Optional[LocalFileInfo]:
         """Parse a single metadata JSON file."""
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(path, 'rb') as f:
+                if _metadata_loads is not json.loads and os.fstat(f.fileno()).st_size >= MMAP_MIN_SIZE:
+                    # Parse from the page cache without copying into a bytes object
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        with memoryview(mm) as view:
+                            data = _load_metadata(view)
+                else:
+                    data = _load_metadata(f.read())
             
             # Handle both dict and list formats
             if isinstance(data, list):
@@ -271,7 +625,7 @@ class LocalScanner:
                     return None
             
             # Extract relevant fields
-            file_name = data.get('file_name', '')
+            file_name = data.get('file_name') or ''  # explicit null too
             sha256 = data.get('sha256')
             file_path = data.get('file_path')
             size = data.get('size')
@@ -293,7 +647,7 @@ class LocalScanner:
                 size=size,
                 model_name=model_name,
                 base_model=base_model,
-                metadata_path=str(path)
+                metadata_path=path
             )
             
         except json.JSONDecodeError as e:
@@ -303,12 +657,16 @@ class LocalScanner:
             self._stats['parse_errors'] += 1
             return None
     
-    def _cleanup_cache(self):
-        """Remove cache entries for files that no longer exist."""
+    def _save_cache(self):
+        """Write queued entries and drop entries for files that no longer exist."""
         if not self._cache:
             return
-        existing_paths = {str(p) for p in self._metadata_files}
-        self._cache.cleanup_stale(existing_paths)
+        # Stale entries come from the rows loaded at the start, no extra query
+        existing_paths = set(self._metadata_files)
+        stale = [p for p in self._cache_rows if p not in existing_paths]
+        self._cache.write_changes(self._pending_entries, stale)
+        self._pending_entries = []
+        self._cache.close()
     
     def clear_cache(self):
         """Delete the cache file."""
@@ -320,62 +678,54 @@ class LocalScanner:
     
     def get_by_sha256(self, sha256: str) -> Optional[LocalFileInfo]:
         """Find a local file by SHA256 hash."""
-        sha256_lower = sha256.lower()
-        for f in self._local_files:
-            if f.sha256 and f.sha256.lower() == sha256_lower:
-                return f
-        return None
+        return self._sha256_index.get(sha256.lower())
     
     def get_by_filename(self, filename: str) -> List[LocalFileInfo]:
         """Find local files by filename (may return multiple matches)."""
-        matches = []
         filename_lower = filename.lower()
+        name_no_ext = filename_stem(Path(filename_lower).name)
         
-        for f in self._local_files:
-            # Check against file_name
-            if f.file_name and f.file_name.lower() == filename_lower:
-                matches.append(f)
-                continue
-            
-            # Check against basename from file_path
-            if f.basename.lower() == filename_lower:
-                matches.append(f)
-                continue
-            
-            # Check without extension
-            name_no_ext = Path(filename_lower).stem
-            local_no_ext = Path(f.basename.lower()).stem
-            if name_no_ext == local_no_ext:
-                matches.append(f)
+        # Files whose file_name or basename is filename, or whose stem matches
+        # its stem; sorted back into scan order
+        rows = set(self._name_rows.get(filename_lower, ()))
+        rows.update(self._stem_rows.get(name_no_ext, ()))
+        return [self._local_files[row] for row in sorted(rows)]
+    
+    def _add_local_file(self, file_info: LocalFileInfo):
+        """Record a scanned file and add it to the lookup indexes."""
+        row = len(self._local_files)
+        self._local_files.append(file_info)
         
-        return matches
+        if file_info.sha256:
+            # First file wins when several share a hash
+            self._sha256_index.setdefault(file_info.sha256, file_info)
+        
+        # Lowercased names are computed once here and reused by every lookup
+        file_info._base_lc = basename = sys.intern(file_info.basename.lower())
+        file_info._stem_lc = stem = sys.intern(filename_stem(basename))
+        
+        # Index by basename
+        self._filename_index.setdefault(basename, []).append(file_info)
+        
+        # Also index by stem (without extension)
+        if stem != basename:
+            self._filename_index.setdefault(stem, []).append(file_info)
+        
+        # get_by_filename matches file_name as well as the basename
+        self._name_rows.setdefault(basename, []).append(row)
+        if file_info.file_name:
+            file_name = file_info.file_name.lower()
+            if file_name != basename:
+                self._name_rows.setdefault(file_name, []).append(row)
+        self._stem_rows.setdefault(stem, []).append(row)
     
     def build_sha256_index(self) -> Dict[str, LocalFileInfo]:
-        """Build an index of files by SHA256 for fast lookup."""
-        index = {}
-        for f in self._local_files:
-            if f.sha256:
-                index[f.sha256.lower()] = f
-        return index
+        """Get a copy of the index of files by SHA256 (built during scan)."""
+        return dict(self._sha256_index)
     
     def build_filename_index(self) -> Dict[str, List[LocalFileInfo]]:
-        """Build an index of files by filename for fast lookup."""
-        index: Dict[str, List[LocalFileInfo]] = {}
-        for f in self._local_files:
-            # Index by basename
-            basename = f.basename.lower()
-            if basename not in index:
-                index[basename] = []
-            index[basename].append(f)
-            
-            # Also index by stem (without extension)
-            stem = Path(basename).stem
-            if stem not in index:
-                index[stem] = []
-            if f not in index[stem]:
-                index[stem].append(f)
-        
-        return index
+        """Get a copy of the index of files by filename and stem (built during scan)."""
+        return {name: list(files) for name, files in self._filename_index.items()}
     
     @property
     def file_count(self) -> int:
@@ -411,16 +761,28 @@ class DirectScanner:
     
     CACHE_FILENAME = ".hf_checker_direct_cache.sqlite"
     
-    def __init__(self, directory: str, use_cache: bool = True):
+    def __init__(self, directory: str, use_cache: bool = True, max_workers: Optional[int] = None):
+        """
+        Initialize scanner with a directory path.
+        
+        Args:
+            directory: Path to directory containing model files
+            use_cache: Whether to use caching (default: True)
+            max_workers: Number of files hashed in parallel (default: min(8, CPU count)).
+                         hashlib releases the GIL while hashing, so threads run in parallel.
+        """
         self.directory = Path(directory)
         if not self.directory.exists():
             raise ValueError(f"Directory does not exist: {directory}")
         
         self.use_cache = use_cache
-        self._model_files: List[Path] = []
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self._hasher_factory = _SHA256_FACTORY
+        self._model_files: List[str] = []
         self._local_files: List[LocalFileInfo] = []
         self._sqlite_cache: Optional[SQLiteMetadataCache] = None
         self._cache_path = self.directory / self.CACHE_FILENAME
+        self._cache_rows: Dict[str, tuple] = {}
         
         self._stats = {
             'cache_hits': 0,
@@ -461,137 +823,217 @@ class DirectScanner:
                 self._cache_path.unlink()
             self._sqlite_cache = SQLiteMetadataCache(self._cache_path, str(self.directory)) if self.use_cache else None
         
-        # Find all model files 
-        visited_dirs = set()
-        for root, dirs, files in os.walk(self.directory, followlinks=True):
-            
-            real_root = os.path.realpath(root)
-            if real_root in visited_dirs:
-                dirs[:] = []  
-                continue
-            visited_dirs.add(real_root)
-            
-            for file in files:
-                if any(file.lower().endswith(ext) for ext in extensions):
-                    self._model_files.append(Path(root) / file)
+        # Read the whole cache once instead of querying it per file
+        # (empty without a cache, so the loop below needs no cache check)
+        self._cache_rows = cache_rows = self._sqlite_cache.load_all() if self._sqlite_cache else {}
         
-        self._stats['files_scanned'] = len(self._model_files)
-        
-        # Check how many will need hashing (not in cache)
-        files_to_hash = []
-        for model_path in self._model_files:
-            path_str = str(model_path)
-            try:
-                stat = model_path.stat()
-                if self._sqlite_cache:
-                    cached = self._sqlite_cache.get_entry(path_str)
-                    if cached:
-                        mtime, size, _ = cached
-                        if mtime == stat.st_mtime and size == stat.st_size:
-                            continue  # Will be a cache hit
-            except OSError:
-                continue
-            files_to_hash.append(model_path)
-        
-        # Hash files with progress bar if there are files to hash
-        if show_progress and files_to_hash:
-            with Progress(
-                SpinnerColumn(),
-                TextColumn("[progress.description]{task.description}"),
-                BarColumn(),
-                TaskProgressColumn(),
-                TextColumn("•"),
-                TimeRemainingColumn(),
-            ) as progress:
-                task = progress.add_task(
-                    f"[cyan]Hashing {len(files_to_hash)} files...", 
-                    total=len(files_to_hash)
-                )
+        # Walk, classify and start hashing in a single pass: cache hits are resolved
+        # right away and misses are submitted to the pool as soon as the walk finds
+        # them, so hashing overlaps the rest of the directory enumeration (which can
+        # be slow on network drives). Each result goes in its file's slot so walk
+        # order is kept regardless of the order hashes finish in.
+        results: List[Optional[LocalFileInfo]] = []
+        # Files reported to progress_callback before the hashes: cache hits and
+        # files that couldn't be stat'ed (skipped, but still counted in total)
+        ready_names: List[str] = []
+        futures = {}
+        # Model paths in the order they were queued for hashing, for readahead
+        queued: List[str] = []
+        readahead = hasattr(os, 'posix_fadvise')
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            for i, (path_str, stat) in enumerate(_walk_files(str(self.directory), extensions)):
+                self._model_files.append(path_str)
+                results.append(None)
+                if stat is None:
+                    ready_names.append(os.path.basename(path_str))
+                    continue
                 
-                hash_count = 0
-                for i, model_path in enumerate(self._model_files):
-                    file_info = self._get_file_info_cached(model_path)
+                # One dict lookup per file; rows are (file_path, mtime, size, ...)
+                row = cache_rows.get(path_str)
+                if row and row[1] == stat.st_mtime and row[2] == stat.st_size:
+                    file_info = SQLiteMetadataCache.row_file_info(row)
                     if file_info:
-                        self._local_files.append(file_info)
-                    
-                    # Update progress only for files that needed hashing
-                    if model_path in files_to_hash:
+                        self._stats['cache_hits'] += 1
+                        results[i] = file_info
+                        ready_names.append(os.path.basename(path_str))
+                        continue
+                
+                if readahead:
+                    future = executor.submit(
+                        self._hash_with_readahead, path_str, stat.st_size, queued,
+                        len(queued) + self.max_workers + READAHEAD_FILES
+                    )
+                    queued.append(path_str)
+                else:
+                    future = executor.submit(self._hash_file, path_str, stat.st_size)
+                futures[future] = (i, path_str, stat.st_mtime, stat.st_size)
+            
+            self._stats['files_scanned'] = len(self._model_files)
+            
+            total = len(self._model_files)
+            done = 0
+            if progress_callback:
+                for name in ready_names:
+                    done += 1
+                    progress_callback(name, done, total)
+            
+            # Collect the hashes, with a progress bar if requested
+            if futures:
+                progress = None
+                if show_progress:
+                    progress = Progress(
+                        SpinnerColumn(),
+                        TextColumn("[progress.description]{task.description}"),
+                        BarColumn(),
+                        TaskProgressColumn(),
+                        TextColumn("•"),
+                        TimeRemainingColumn(),
+                    )
+                    progress.start()
+                    task = progress.add_task(
+                        f"[cyan]Hashing {len(futures)} files...", 
+                        total=len(futures)
+                    )
+                
+                try:
+                    hash_count = 0
+                    for future in as_completed(futures):
+                        i, model_path, mtime, size = futures[future]
+                        name = os.path.basename(model_path)
+                        file_info = future.result()
+                        
+                        # Stats and cache writes stay on this thread
+                        self._stats['cache_misses'] += 1
+                        if file_info:
+                            results[i] = file_info
+                            if self._sqlite_cache:
+                                self._sqlite_cache.set_entry(model_path, mtime, size, file_info)
+                        else:
+                            self._stats['hash_errors'] += 1
+                        
                         hash_count += 1
-                        progress.update(
-                            task, 
-                            completed=hash_count,
-                            description=f"[cyan]Hashing: {model_path.name[:40]}..."
-                        )
+                        done += 1
+                        if progress_callback:
+                            progress_callback(name, done, total)
+                        if progress:
+                            progress.update(
+                                task, 
+                                completed=hash_count,
+                                description=f"[cyan]Hashing: {name[:40]}..."
+                            )
+                finally:
+                    if progress:
+                        progress.stop()
+        except BaseException:
+            # Ctrl+C or an error: drop the queued files instead of hashing them
+            # all first (cancel_futures needs 3.9+, so cancel them one by one)
+            for future in futures:
+                future.cancel()
+            executor.shutdown(wait=False)
+            raise
         else:
-            # No progress bar needed (all cached or progress disabled)
-            for i, model_path in enumerate(self._model_files):
-                if progress_callback:
-                    progress_callback(model_path.name, i + 1, len(self._model_files))
-                
-                file_info = self._get_file_info_cached(model_path)
-                if file_info:
-                    self._local_files.append(file_info)
+            executor.shutdown()
+        
+        self._local_files = [f for f in results if f is not None]
         
         # Cleanup stale cache entries
         self._cleanup_cache()
         
         return self._local_files
     
-    def _get_file_info_cached(self, path: Path) -> Optional[LocalFileInfo]:
-        """Get file info, using cached hash if file hasn't changed."""
-        path_str = str(path)
-        
-        try:
-            stat = path.stat()
-            current_mtime = stat.st_mtime
-            current_size = stat.st_size
-        except OSError:
-            return None
-        
-        # Check SQLite cache
-        if self._sqlite_cache:
-            cached = self._sqlite_cache.get_entry(path_str)
-            if cached:
-                mtime, size, file_info = cached
-                if mtime == current_mtime and size == current_size and file_info:
-                    self._stats['cache_hits'] += 1
-                    return file_info
-        
-        # Cache miss
-        self._stats['cache_misses'] += 1
-        file_info = self._hash_file(path)
-        
-        # Store in SQLite cache
-        if self._sqlite_cache and file_info:
-            self._sqlite_cache.set_entry(path_str, current_mtime, current_size, file_info)
+    def _hash_file(self, path: str, size: Optional[int] = None) -> Optional[LocalFileInfo]:
+        """
+        Calculate SHA256 hash of a file.
         
-        return file_info
-    
-    def _hash_file(self, path: Path) -> Optional[LocalFileInfo]:
-        """Calculate SHA256 hash of a file."""
+        Args:
+            path: Model file path
+            size: File size from the directory walk, if already known (saves a stat)
+        """
         try:
-            sha256 = hashlib.sha256()
-            with open(path, 'rb') as f:
-                # Read in 1MB chunks to handle large files
-                for chunk in iter(lambda: f.read(1024 * 1024), b''):
-                    sha256.update(chunk)
+            with open(path, 'rb', buffering=0) as f:
+                # The whole file is read front to back; let the kernel read ahead further
+                if hasattr(os, 'posix_fadvise'):
+                    try:
+                        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+                    except OSError:
+                        pass
+                
+                if size is None:
+                    size = os.fstat(f.fileno()).st_size
+                
+                sha256 = None
+                if size >= MMAP_HASH_MIN_SIZE:
+                    sha256 = self._hash_mapped(f)
+                
+                if sha256 is None and _HAVE_FILE_DIGEST:
+                    # Stdlib read/update loop over a reused buffer
+                    sha256 = hashlib.file_digest(f, self._hasher_factory)
+                elif sha256 is None:
+                    sha256 = self._hasher_factory()
+                    # Reuse one buffer for every chunk and read straight into it
+                    # (unbuffered), so large files don't allocate a new bytes per read
+                    buf = bytearray(HASH_CHUNK_SIZE)
+                    view = memoryview(buf)
+                    while True:
+                        n = f.readinto(buf)
+                        if not n:
+                            break
+                        sha256.update(view[:n])
             
             return LocalFileInfo(
-                file_name=path.stem,
+                file_name=os.path.splitext(os.path.basename(path))[0],
                 sha256=sha256.hexdigest().lower(),
-                file_path=str(path),
-                size=path.stat().st_size,
+                file_path=path,
+                size=size,
                 metadata_path=""  # No metadata file
             )
         except Exception as e:
-            self._stats['hash_errors'] += 1
+            # Counted as a hash error by the caller (this runs on worker threads)
+            return None
+    
+    def _hash_with_readahead(self, path: str, size: int, queued: List[str], ahead: int) -> Optional[LocalFileInfo]:
+        """
+        Hash a file after asking the kernel to prefetch a file further down the queue.
+        
+        The prefetch hides the seek/first-read latency of cold files behind the
+        current hash. queued is appended to by the walk while workers run; a
+        file that hasn't been queued yet is simply not prefetched.
+        """
+        if ahead < len(queued):
+            _readahead(queued[ahead])
+        return self._hash_file(path, size)
+    
+    def _hash_mapped(self, f):
+        """
+        Hash an open file through a read-only memory map in a single update.
+        
+        The hasher reads straight from the page cache without copying chunks
+        into Python buffers. Returns None if the file can't be mapped (e.g. address
+        space limits on 32-bit builds), so the caller falls back to reading it.
+        """
+        try:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if hasattr(mm, 'madvise') and hasattr(mmap, 'MADV_SEQUENTIAL'):
+                    try:
+                        mm.madvise(mmap.MADV_SEQUENTIAL)
+                    except OSError:
+                        pass
+                sha256 = self._hasher_factory()
+                sha256.update(mm)
+                return sha256
+        except (OSError, ValueError, OverflowError):
             return None
     
     def _cleanup_cache(self):
         """Remove cache entries for deleted files."""
         if self._sqlite_cache:
-            valid_paths = {str(p) for p in self._model_files}
-            self._sqlite_cache.cleanup_stale(valid_paths)
+            # Compared against the rows loaded at the start; only writes if something is stale
+            valid_paths = set(self._model_files)
+            stale = [p for p in self._cache_rows if p not in valid_paths]
+            # Also writes any hashes still queued by set_entry
+            self._sqlite_cache.write_changes([], stale)
+            self._sqlite_cache.close()
     
     def clear_cache(self):
         """Delete the cache file."""
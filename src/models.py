@@ -1,7 +1,16 @@
+import sys
 from dataclasses import dataclass, field
-from typing import Optional, List
+from typing import Optional, List, Dict
 from enum import Enum
 
+# dataclass(slots=True) needs Python 3.10+; older versions get regular classes
+_DATACLASS_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+
+def filename_stem(basename: str) -> str:
+    """Filename without its last extension (cheaper than Path(basename).stem)."""
+    return basename.rpartition(".")[0] or basename
+
 
 class MatchStatus(Enum):
     """Status of file comparison"""
@@ -12,7 +21,7 @@ class MatchStatus(Enum):
     NAME_MATCH_ONLY = "name_match_only"  # Name matches but no SHA256 to compare
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class HFFileInfo:
     """File information from HuggingFace repository"""
     filename: str
@@ -21,13 +30,35 @@ class HFFileInfo:
     path: str = ""  # Full path in repo (e.g., "subfolder/file.safetensors")
     lfs: bool = False  # Whether file is stored in LFS
     
+    # Lowercased lookup keys, filled in by the Comparator when indexing
+    _base_lc: str = field(default="", init=False, repr=False, compare=False)
+    _stem_lc: str = field(default="", init=False, repr=False, compare=False)
+    _basename: str = field(default="", init=False, repr=False, compare=False)
+    # The hash as supplied, kept only when it wasn't already lowercase
+    _given_sha256: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Normalize the hash once so lookups can compare it directly; interning
+        # lets the local and HF copies of the same hash share one string object
+        if self.sha256:
+            sha256 = self.sha256.lower()
+            if sha256 != self.sha256:
+                self._given_sha256 = self.sha256
+            self.sha256 = sys.intern(sha256)
+        self._basename = self.filename.rpartition("/")[2]
+    
     @property
     def basename(self) -> str:
         """Get just the filename without path"""
-        return self.filename.split("/")[-1] if "/" in self.filename else self.filename
+        return self._basename
+    
+    @property
+    def given_sha256(self) -> Optional[str]:
+        """The hash as HuggingFace returned it, before lowercasing"""
+        return self._given_sha256 or self.sha256
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class LocalFileInfo:
     """File information from local metadata JSON"""
     file_name: str
@@ -38,15 +69,28 @@ class LocalFileInfo:
     base_model: Optional[str] = None
     metadata_path: str = ""  # Path to the JSON metadata file
     
+    # Lowercased lookup keys, filled in by the scanner or the Comparator when indexing
+    _base_lc: str = field(default="", init=False, repr=False, compare=False)
+    _stem_lc: str = field(default="", init=False, repr=False, compare=False)
+    _basename: str = field(default="", init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        # Normalize the hash once so lookups can compare it directly; interning
+        # lets the local and HF copies of the same hash share one string object
+        if self.sha256:
+            self.sha256 = sys.intern(self.sha256.lower())
+        if self.file_path:
+            self._basename = self.file_path.replace("\\", "/").rpartition("/")[2]
+        else:
+            self._basename = self.file_name
+    
     @property
     def basename(self) -> str:
         """Get just the filename"""
-        if self.file_path:
-            return self.file_path.replace("\\", "/").split("/")[-1]
-        return self.file_name
+        return self._basename
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ComparisonResult:
     """Result of comparing a file"""
     filename: str
@@ -62,7 +106,7 @@ class ComparisonResult:
     notes: str = ""
 
 
-@dataclass
+@dataclass(**_DATACLASS_SLOTS)
 class ComparisonSummary:
     """Summary of all comparisons"""
     total_hf_files: int = 0
@@ -72,19 +116,31 @@ class ComparisonSummary:
     missing_local: List[ComparisonResult] = field(default_factory=list)
     missing_remote: List[ComparisonResult] = field(default_factory=list)
     name_matches_only: List[ComparisonResult] = field(default_factory=list)
+    # Per-status totals kept by Comparator.compare; the *_count properties read
+    # these and only fall back to len() on summaries built by hand
+    counts: Optional[Dict[MatchStatus, int]] = None
+    
+    def _count(self, status: MatchStatus, results: List[ComparisonResult]) -> int:
+        if self.counts is not None:
+            return self.counts.get(status, 0)
+        return len(results)
     
     @property
     def match_count(self) -> int:
-        return len(self.matches)
+        return self._count(MatchStatus.MATCH, self.matches)
     
     @property
     def mismatch_count(self) -> int:
-        return len(self.mismatches)
+        return self._count(MatchStatus.MISMATCH, self.mismatches)
     
     @property
     def missing_local_count(self) -> int:
-        return len(self.missing_local)
+        return self._count(MatchStatus.MISSING_LOCAL, self.missing_local)
     
     @property
     def missing_remote_count(self) -> int:
-        return len(self.missing_remote)
\ No newline at end of file
+        return self._count(MatchStatus.MISSING_REMOTE, self.missing_remote)
+    
+    @property
+    def name_match_only_count(self) -> int:
+        return self._count(MatchStatus.NAME_MATCH_ONLY, self.name_matches_only)
\ No newline at end of file
@@ -5,47 +5,210 @@ Allows browser extensions to check file status against local directories.
 
 import os
 import sys
-import hashlib
+import json
+import threading
+from array import array
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Callable, Dict, List, Optional, Tuple
 from dataclasses import dataclass, field
+from functools import lru_cache
 from datetime import datetime
 
 # Add src directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 
 from config import get_config_manager, DirectoryConfig
 from local_scanner import DirectScanner, LocalScanner
-from models import LocalFileInfo
+from models import HFFileInfo, LocalFileInfo
 from hf_client import HuggingFaceClient
 
+# orjson is optional; it serializes the check_* responses several times faster
+# than the json module behind jsonify
+try:
+    import orjson
+    _json_bytes = orjson.dumps
+except ImportError:
+    def _json_bytes(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
 
 app = Flask(__name__)
 app.json.ensure_ascii = False  
 CORS(app)  
 
 
+# Responses kept per HashCache for repeated check_sha256/check_filename calls
+LOOKUP_RESPONSE_CACHE_SIZE = 1024
+
+
 @dataclass
 class HashCache:
-    """In-memory cache of all SHA256 hashes across directories."""
-    sha256_index: Dict[str, List[dict]] = field(default_factory=dict)
-    filename_index: Dict[str, List[dict]] = field(default_factory=dict)
+    """
+    In-memory cache of all SHA256 hashes across directories.
+    
+    Files are stored column-wise: row i of paths, sha256s, basenames, sizes and
+    dir_ids describes one file, and the indexes map a lowercased key to row
+    numbers. Per-file dicts are only built for the rows a response returns.
+    The indexes are defaultdicts while files are added and plain dicts after
+    freeze(), so a lookup can never insert an empty entry.
+    """
+    paths: List[Optional[str]] = field(default_factory=list)
+    sha256s: List[Optional[str]] = field(default_factory=list)
+    basenames: List[str] = field(default_factory=list)
+    sizes: array = field(default_factory=lambda: array('q'))  # -1 when unknown
+    dir_ids: array = field(default_factory=lambda: array('H'))  # Index into directories_scanned
+    sha256_index: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
+    filename_index: Dict[str, List[int]] = field(default_factory=lambda: defaultdict(list))
     total_files: int = 0
     last_scan: Optional[str] = None
     directories_scanned: List[str] = field(default_factory=list)
+    directory_names: List[str] = field(default_factory=list)
+    
+    def __post_init__(self):
+        # Serialized check_sha256/check_filename bodies for recently asked keys.
+        # Each rescan builds a new HashCache, so a cached body can't go stale.
+        self.lookup_response = lru_cache(maxsize=LOOKUP_RESPONSE_CACHE_SIZE)(self._lookup_response)
+    
+    def add_directory(self, dir_config: DirectoryConfig, files: List[LocalFileInfo]):
+        """Add a scanned directory and all of its files."""
+        dir_id = len(self.directories_scanned)
+        self.directories_scanned.append(dir_config.path)
+        self.directory_names.append(dir_config.name)
+        
+        for f in files:
+            # Metadata JSON can hold anything under "size" (floats, strings...);
+            # the column only takes non-negative 64-bit ints, the rest is unknown
+            size = f.size
+            if type(size) is not int or not 0 <= size < 2 ** 63:
+                size = -1
+            self._add_row(f.file_path, f.sha256, f.basename, size, dir_id)
+    
+    def has_directory(self, resolved: Path) -> bool:
+        """Whether the directory (an already resolved path) was scanned into this cache."""
+        return any(Path(path).resolve() == resolved for path in self.directories_scanned)
+    
+    def copy(self, exclude: Optional[Path] = None) -> "HashCache":
+        """
+        Unfrozen copy of this cache, for adding or dropping a directory without a rescan.
+        
+        Args:
+            exclude: Resolved path of a directory whose files are left out
+        """
+        new = HashCache(last_scan=self.last_scan)
+        new_dir_ids = {}
+        for dir_id, (path, name) in enumerate(zip(self.directories_scanned, self.directory_names)):
+            if exclude is not None and Path(path).resolve() == exclude:
+                continue
+            new_dir_ids[dir_id] = len(new.directories_scanned)
+            new.directories_scanned.append(path)
+            new.directory_names.append(name)
+        
+        for row, dir_id in enumerate(self.dir_ids):
+            new_dir_id = new_dir_ids.get(dir_id)
+            if new_dir_id is not None:
+                new._add_row(self.paths[row], self.sha256s[row], self.basenames[row], self.sizes[row], new_dir_id)
+        return new
+    
+    def _add_row(self, path: Optional[str], sha256: Optional[str], basename: str, size: int, dir_id: int):
+        """Append a file as a new row and index it by SHA256 and filename."""
+        row = len(self.paths)
+        self.paths.append(path)
+        self.sha256s.append(sha256)
+        self.basenames.append(basename)
+        self.sizes.append(size)
+        self.dir_ids.append(dir_id)
+        
+        # Index by SHA256; LocalFileInfo already lowercases (and interns) it, so
+        # the key is the same string object as the sha256s column entry
+        if sha256:
+            self.sha256_index[sha256].append(row)
+        
+        # Index by filename
+        self.filename_index[basename.lower()].append(row)
+        
+        self.total_files += 1
+    
+    def freeze(self):
+        """Turn the indexes into plain dicts once all files are added."""
+        self.sha256_index = dict(self.sha256_index)
+        self.filename_index = dict(self.filename_index)
+    
+    def paths_of(self, rows: List[int]) -> List[Optional[str]]:
+        """Local paths of the given rows."""
+        return [self.paths[row] for row in rows]
+    
+    def directory_names_of(self, rows: List[int]) -> List[str]:
+        """Configured directory names of the given rows."""
+        names = self.directory_names
+        dir_ids = self.dir_ids
+        return [names[dir_ids[row]] for row in rows]
+    
+    def unique_directory_names_of(self, rows: List[int]) -> List[str]:
+        """Directory names of the given rows without repeats, in first-seen order."""
+        if len(rows) == 1:
+            return [self.directory_names[self.dir_ids[rows[0]]]]
+        return list(dict.fromkeys(self.directory_names_of(rows)))
+    
+    def _lookup_response(self, key_name: str, value: str) -> bytes:
+        """JSON body for check_sha256 (key_name 'sha256') or check_filename ('filename')."""
+        index = self.sha256_index if key_name == 'sha256' else self.filename_index
+        rows = index.get(value.lower())
+        matches = [self.row_to_dict(row) for row in rows] if rows else []
+        return _json_bytes({
+            'found': bool(matches),
+            key_name: value,
+            'matches': matches,
+            'count': len(matches)
+        })
+    
+    def row_to_dict(self, row: int) -> dict:
+        """The JSON form of one file, as returned by the check endpoints."""
+        size = self.sizes[row]
+        dir_id = self.dir_ids[row]
+        return {
+            'filename': self.basenames[row],
+            'sha256': self.sha256s[row],
+            'path': self.paths[row],
+            'size': size if size >= 0 else None,
+            'directory': self.directories_scanned[dir_id],
+            'directory_name': self.directory_names[dir_id]
+        }
 
+# Requests read whichever HashCache _hash_cache points to, binding it once so
+# a single response never mixes two scans. rebuild_cache fills a new cache and
+# swaps it in when done; the lock only keeps two rebuilds from running at once.
 _hash_cache = HashCache()
+_rebuild_lock = threading.Lock()
+
+
+def _json_response(obj) -> Response:
+    """JSON response for the hot check_* endpoints, without going through jsonify."""
+    return Response(_json_bytes(obj), mimetype='application/json')
+
+# check_repo file entries serialized per chunk of the streamed response
+REPO_STREAM_BATCH = 256
 
+# Metadata directories scanned at the same time by rebuild_cache
+SCAN_WORKERS = 4
 
-def scan_directory(dir_config: DirectoryConfig) -> List[LocalFileInfo]:
-    """Scan a single directory and return file info."""
+
+def scan_directory(dir_config: DirectoryConfig, log: Callable[[str], None] = print) -> List[LocalFileInfo]:
+    """
+    Scan a single directory and return file info.
+    
+    Args:
+        dir_config: Directory to scan
+        log: Receives the progress/result lines (printed by default)
+    """
     path = dir_config.path
     
     if not os.path.isdir(path):
-        print(f"  Warning: Directory does not exist: {path}")
+        log(f"  Warning: Directory does not exist: {path}")
         return []
     
     try:
@@ -54,11 +217,11 @@ def scan_directory(dir_config: DirectoryConfig) -> List[LocalFileInfo]:
             files = scanner.scan()
             stats = scanner.stats
             if stats['cache_hits'] > 0 and stats['cache_misses'] == 0:
-                print(f"  → {len(files)} files (all from cache)")
+                log(f"  → {len(files)} files (all from cache)")
             elif stats['cache_hits'] > 0:
-                print(f"  → {len(files)} files ({stats['cache_hits']} cached, {stats['cache_misses']} new)")
+                log(f"  → {len(files)} files ({stats['cache_hits']} cached, {stats['cache_misses']} new)")
             else:
-                print(f"  → {len(files)} metadata files parsed")
+                log(f"  → {len(files)} metadata files parsed")
             return files
         else:
             scanner = DirectScanner(path, use_cache=True)
@@ -66,67 +229,126 @@ def scan_directory(dir_config: DirectoryConfig) -> List[LocalFileInfo]:
             files = scanner.scan(extensions=dir_config.extensions, show_progress=True)
             stats = scanner.stats
             if stats['cache_hits'] > 0 and stats['cache_misses'] == 0:
-                print(f"  → {len(files)} files (all from cache)")
+                log(f"  → {len(files)} files (all from cache)")
             elif stats['cache_hits'] > 0:
-                print(f"  → {len(files)} files ({stats['cache_hits']} cached, {stats['cache_misses']} newly hashed)")
+                log(f"  → {len(files)} files ({stats['cache_hits']} cached, {stats['cache_misses']} newly hashed)")
             else:
-                print(f"  → {len(files)} files hashed")
+                log(f"  → {len(files)} files hashed")
             return files
     except Exception as e:
-        print(f"  Error scanning {path}: {e}")
+        log(f"  Error scanning {path}: {e}")
         return []
 
 
+def _scan_directory_quietly(dir_config: DirectoryConfig) -> Tuple[List[LocalFileInfo], List[str]]:
+    """scan_directory for a worker thread; returns the files and the lines it would have printed."""
+    lines: List[str] = []
+    files = scan_directory(dir_config, log=lines.append)
+    return files, lines
+
+
 def rebuild_cache():
     """Rebuild the in-memory hash cache from all configured directories."""
     global _hash_cache
     
-    config_manager = get_config_manager()
-    config = config_manager.config
-    directories = config_manager.get_enabled_directories()
-    
-    _hash_cache = HashCache()
-    _hash_cache.last_scan = datetime.now().isoformat()
+    with _rebuild_lock:
+        config_manager = get_config_manager()
+        directories = config_manager.get_enabled_directories()
+        
+        cache = HashCache()
+        cache.last_scan = datetime.now().isoformat()
+        
+        if not directories:
+            _hash_cache = cache
+            print("No directories configured.")
+            print("Add a directory with: python main.py config --add \"path\"")
+            return
+        
+        print(f"\nScanning {len(directories)} directory(s)...\n")
+        
+        # Metadata directories only read small JSON files, so they are scanned
+        # in the background while the loop below works through the others.
+        # Direct-hash scans already hash on their own thread pool and draw a
+        # progress bar, so those still run one at a time, in config order.
+        metadata_dirs = [d for d in directories if d.scan_mode == "metadata"]
+        background = {}
+        executor = None
+        if len(directories) > 1 and metadata_dirs:
+            executor = ThreadPoolExecutor(max_workers=min(SCAN_WORKERS, len(metadata_dirs)))
+            for dir_config in metadata_dirs:
+                background[id(dir_config)] = executor.submit(_scan_directory_quietly, dir_config)
+        
+        try:
+            for dir_config in directories:
+                mode_str = "metadata" if dir_config.scan_mode == "metadata" else "direct hash"
+                print(f"[{mode_str}] {dir_config.path}")
+                future = background.get(id(dir_config))
+                if future is not None:
+                    # Its output was held back so the log stays in directory order
+                    files, lines = future.result()
+                    for line in lines:
+                        print(line)
+                else:
+                    files = scan_directory(dir_config)
+                
+                cache.add_directory(dir_config, files)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        
+        cache.freeze()
+        _hash_cache = cache
     
-    if not directories:
-        print("No directories configured.")
-        print("Add a directory with: python main.py config --add \"path\"")
-        return
+    print(f"Cache rebuilt: {cache.total_files} files indexed")
+
+
+
+def add_directory_to_cache(dir_config: DirectoryConfig):
+    """
+    Scan one newly configured directory into the cache, leaving the others as they are.
     
-    print(f"\nScanning {len(directories)} directory(s)...\n")
+    Falls back to rebuild_cache when nothing has been scanned yet (server
+    started with --no-scan) or when the directory is already in the cache,
+    e.g. re-added with a different scan mode.
+    """
+    global _hash_cache
     
-    for dir_config in directories:
-        mode_str = "metadata" if dir_config.scan_mode == "metadata" else "direct hash"
-        print(f"[{mode_str}] {dir_config.path}")
-        files = scan_directory(dir_config)
-        _hash_cache.directories_scanned.append(dir_config.path)
-        
-        for f in files:
-            file_info = {
-                'filename': f.basename,
-                'sha256': f.sha256,
-                'path': f.file_path,
-                'size': f.size,
-                'directory': dir_config.path,
-                'directory_name': dir_config.name
-            }
-            
-            # Index by SHA256
-            if f.sha256:
-                sha_lower = f.sha256.lower()
-                if sha_lower not in _hash_cache.sha256_index:
-                    _hash_cache.sha256_index[sha_lower] = []
-                _hash_cache.sha256_index[sha_lower].append(file_info)
+    with _rebuild_lock:
+        old = _hash_cache
+        incremental = (
+            old.last_scan is not None
+            and dir_config.enabled
+            and not old.has_directory(Path(dir_config.path).resolve())
+        )
+        if incremental:
+            mode_str = "metadata" if dir_config.scan_mode == "metadata" else "direct hash"
+            print(f"[{mode_str}] {dir_config.path}")
+            files = scan_directory(dir_config)
             
-            # Index by filename
-            basename_lower = f.basename.lower()
-            if basename_lower not in _hash_cache.filename_index:
-                _hash_cache.filename_index[basename_lower] = []
-            _hash_cache.filename_index[basename_lower].append(file_info)
-            
-            _hash_cache.total_files += 1
+            cache = old.copy()
+            cache.add_directory(dir_config, files)
+            cache.freeze()
+            _hash_cache = cache
+            print(f"Cache updated: {cache.total_files} files indexed")
+    
+    if not incremental:
+        rebuild_cache()
+
+
+def remove_directory_from_cache(path: str):
+    """Drop a removed directory's files from the cache without rescanning the rest."""
+    global _hash_cache
+    
+    with _rebuild_lock:
+        old = _hash_cache
+        if old.last_scan is not None:
+            cache = old.copy(exclude=Path(path).resolve())
+            cache.freeze()
+            _hash_cache = cache
+            print(f"Cache updated: {cache.total_files} files indexed")
+            return
     
-    print(f"Cache rebuilt: {_hash_cache.total_files} files indexed")
+    rebuild_cache()
 
 
 
@@ -135,15 +357,16 @@ def rebuild_cache():
 @app.route('/api/status', methods=['GET'])
 def status():
     """Health check and status info."""
+    cache = _hash_cache
     return jsonify({
         'status': 'ok',
         'service': 'hf-file-checker',
         'version': '1.0.0',
         'cache': {
-            'total_files': _hash_cache.total_files,
-            'total_hashes': len(_hash_cache.sha256_index),
-            'last_scan': _hash_cache.last_scan,
-            'directories': len(_hash_cache.directories_scanned)
+            'total_files': cache.total_files,
+            'total_hashes': len(cache.sha256_index),
+            'last_scan': cache.last_scan,
+            'directories': len(cache.directories_scanned)
         }
     })
 
@@ -151,45 +374,44 @@ def status():
 @app.route('/api/check/sha256/<sha256>', methods=['GET'])
 def check_sha256(sha256: str):
     """Check if a SHA256 hash exists locally."""
-    sha_lower = sha256.lower()
-    
-    if sha_lower in _hash_cache.sha256_index:
-        matches = _hash_cache.sha256_index[sha_lower]
-        return jsonify({
-            'found': True,
-            'sha256': sha256,
-            'matches': matches,
-            'count': len(matches)
-        })
-    
-    return jsonify({
-        'found': False,
-        'sha256': sha256,
-        'matches': [],
-        'count': 0
-    })
+    return Response(_hash_cache.lookup_response('sha256', sha256), mimetype='application/json')
 
 
 @app.route('/api/check/filename/<filename>', methods=['GET'])
 def check_filename(filename: str):
     """Check if a filename exists locally (case-insensitive)."""
-    filename_lower = filename.lower()
+    return Response(_hash_cache.lookup_response('filename', filename), mimetype='application/json')
+
+
+def _batch_name_result(cache: HashCache, matches: List[int], sha256: str) -> dict:
+    """check_batch result for a filename hit, checking the SHA256 if the request had one."""
+    if not sha256:
+        return {
+            'found': True,
+            'match_type': 'filename',
+            'local_paths': cache.paths_of(matches),
+            'directories': cache.directory_names_of(matches)
+        }
     
-    if filename_lower in _hash_cache.filename_index:
-        matches = _hash_cache.filename_index[filename_lower]
-        return jsonify({
+    # Check if any SHA256 matches
+    sha_matches = [m for m in matches if cache.sha256s[m] == sha256]
+    if sha_matches:
+        return {
             'found': True,
-            'filename': filename,
-            'matches': matches,
-            'count': len(matches)
-        })
+            'match_type': 'sha256',
+            'local_paths': cache.paths_of(sha_matches),
+            'directories': cache.directory_names_of(sha_matches)
+        }
     
-    return jsonify({
-        'found': False,
-        'filename': filename,
-        'matches': [],
-        'count': 0
-    })
+    # Filename match but SHA256 differs
+    return {
+        'found': True,
+        'match_type': 'filename_only',
+        'mismatch': True,
+        'local_paths': cache.paths_of(matches),
+        'directories': cache.directory_names_of(matches),
+        'local_sha256': cache.sha256s[matches[0]]
+    }
 
 
 @app.route('/api/check/batch', methods=['POST'])
@@ -219,6 +441,11 @@ def check_batch():
     
     results = {}
     
+    # One .get() probe per index instead of an `in` test followed by a lookup
+    cache = _hash_cache
+    sha256_index = cache.sha256_index
+    filename_index = cache.filename_index
+    
     for file_info in data['files']:
         if file_info is None:
             continue
@@ -228,7 +455,7 @@ def check_batch():
         
         # Extract basename from fullPath if available (for files in subfolders)
         if full_path and '/' in full_path:
-            basename_from_path = full_path.split('/')[-1].lower()
+            basename_from_path = full_path.rpartition('/')[2].lower()
         else:
             basename_from_path = filename
         
@@ -238,79 +465,30 @@ def check_batch():
             continue
         
         # Try SHA256 first
-        if sha256 and sha256 in _hash_cache.sha256_index:
-            matches = _hash_cache.sha256_index[sha256]
+        matches = sha256_index.get(sha256) if sha256 else None
+        if matches:
             results[key] = {
                 'found': True,
                 'match_type': 'sha256',
-                'local_paths': [m['path'] for m in matches],
-                'directories': [m['directory_name'] for m in matches]
-            }
-        # Try filename
-        elif filename and filename in _hash_cache.filename_index:
-            matches = _hash_cache.filename_index[filename]
-            # Check if any SHA256 matches
-            if sha256:
-                sha_matches = [m for m in matches if m.get('sha256', '').lower() == sha256]
-                if sha_matches:
-                    results[key] = {
-                        'found': True,
-                        'match_type': 'sha256',
-                        'local_paths': [m['path'] for m in sha_matches],
-                        'directories': [m['directory_name'] for m in sha_matches]
-                    }
-                else:
-                    # Filename match but SHA256 differs
-                    results[key] = {
-                        'found': True,
-                        'match_type': 'filename_only',
-                        'mismatch': True,
-                        'local_paths': [m['path'] for m in matches],
-                        'directories': [m['directory_name'] for m in matches],
-                        'local_sha256': matches[0].get('sha256') if matches else None
-                    }
-            else:
-                results[key] = {
-                    'found': True,
-                    'match_type': 'filename',
-                    'local_paths': [m['path'] for m in matches],
-                    'directories': [m['directory_name'] for m in matches]
-                }
-        # Try basename extracted from fullPath
-        elif basename_from_path and basename_from_path != filename and basename_from_path in _hash_cache.filename_index:
-            matches = _hash_cache.filename_index[basename_from_path]
-            if sha256:
-                sha_matches = [m for m in matches if m.get('sha256', '').lower() == sha256]
-                if sha_matches:
-                    results[key] = {
-                        'found': True,
-                        'match_type': 'sha256',
-                        'local_paths': [m['path'] for m in sha_matches],
-                        'directories': [m['directory_name'] for m in sha_matches]
-                    }
-                else:
-                    results[key] = {
-                        'found': True,
-                        'match_type': 'filename_only',
-                        'mismatch': True,
-                        'local_paths': [m['path'] for m in matches],
-                        'directories': [m['directory_name'] for m in matches],
-                        'local_sha256': matches[0].get('sha256') if matches else None
-                    }
-            else:
-                results[key] = {
-                    'found': True,
-                    'match_type': 'filename',
-                    'local_paths': [m['path'] for m in matches],
-                    'directories': [m['directory_name'] for m in matches]
-                }
-        else:
-            results[key] = {
-                'found': False,
-                'match_type': None
+                'local_paths': cache.paths_of(matches),
+                'directories': cache.directory_names_of(matches)
             }
+            continue
+        
+        # Try filename, then the basename extracted from fullPath
+        matches = filename_index.get(filename) if filename else None
+        if not matches and basename_from_path and basename_from_path != filename:
+            matches = filename_index.get(basename_from_path)
+        if matches:
+            results[key] = _batch_name_result(cache, matches, sha256)
+            continue
+        
+        results[key] = {
+            'found': False,
+            'match_type': None
+        }
     
-    return jsonify({
+    return _json_response({
         'results': results,
         'checked': len(data['files']),
         'found': sum(1 for r in results.values() if r['found'])
@@ -358,9 +536,10 @@ def add_directory():
         scan_mode=data.get('scan_mode', 'files'),
         extensions=data.get('extensions')
     )
+    config_manager.flush()
     
-    # Rescan to include new directory
-    rebuild_cache()
+    # Scan just the new directory into the cache
+    add_directory_to_cache(dir_config)
     
     return jsonify({
         'success': True,
@@ -387,7 +566,8 @@ def remove_directory():
     removed = config_manager.remove_directory(data['path'])
     
     if removed:
-        rebuild_cache()
+        config_manager.flush()
+        remove_directory_from_cache(data['path'])
         return jsonify({'success': True, 'removed': data['path']})
     
     return jsonify({'error': 'Directory not found in config'}), 404
@@ -400,10 +580,11 @@ def remove_directory():
 def rescan():
     """Force rescan all directories."""
     rebuild_cache()
+    cache = _hash_cache
     return jsonify({
         'success': True,
-        'total_files': _hash_cache.total_files,
-        'directories_scanned': len(_hash_cache.directories_scanned)
+        'total_files': cache.total_files,
+        'directories_scanned': len(cache.directories_scanned)
     })
 
 
@@ -414,6 +595,88 @@ def get_config():
     return jsonify(config_manager.config.to_dict())
 
 
+def _match_repo_file(cache: HashCache, hf_file: HFFileInfo, totals: dict) -> dict:
+    """Match one HF file against the local cache for check_repo, updating the totals."""
+    # HFFileInfo and LocalFileInfo lowercase their hashes on construction, so
+    # they compare directly against the sha256s column and index keys
+    sha_lower = hf_file.sha256 or ''
+    filename_lower = hf_file.basename.lower()
+    
+    # Work out the status and the local rows first, so the result dict is
+    # built once with its final values
+    status = 'missing'
+    rows = None
+    local_sha256 = None
+    
+    # Check by SHA256 first
+    if sha_lower:
+        rows = cache.sha256_index.get(sha_lower)
+        if rows:
+            status = 'found'
+    
+    # Check by filename
+    if not rows:
+        matches = cache.filename_index.get(filename_lower)
+        if matches and sha_lower:
+            # Check if any SHA matches
+            sha_matches = [m for m in matches if cache.sha256s[m] == sha_lower]
+            if sha_matches:
+                status, rows = 'found', sha_matches
+            else:
+                status, rows = 'mismatch', matches
+                local_sha256 = cache.sha256s[matches[0]]
+        elif matches:
+            # No SHA to compare, consider found by filename
+            status, rows = 'found', matches
+    
+    file_result = {
+        'filename': hf_file.basename,
+        'path': hf_file.path,
+        'sha256': hf_file.given_sha256,
+        'size': hf_file.size,
+        'status': status,
+        'local_paths': cache.paths_of(rows) if rows else [],
+        'directories': cache.unique_directory_names_of(rows) if rows else []
+    }
+    
+    size = hf_file.size or 0
+    if status == 'found':
+        totals['found'] += 1
+        totals['found_size'] += size
+    elif status == 'mismatch':
+        file_result['local_sha256'] = local_sha256
+        totals['mismatch'] += 1
+        totals['missing_size'] += size
+    else:
+        totals['missing'] += 1
+        totals['missing_size'] += size
+    
+    return file_result
+
+
+def _iter_repo_json(cache: HashCache, hf_files: List[HFFileInfo], totals: dict):
+    """
+    Yield the check_repo response JSON piece by piece.
+    
+    Each file entry is matched and serialized as the response is sent, so the
+    whole 'files' list never sits in memory. The totals come last, once every
+    file has been counted.
+    """
+    dumps = _json_bytes
+    yield b'{"files":['
+    batch = []
+    separator = b''
+    for hf_file in hf_files:
+        batch.append(dumps(_match_repo_file(cache, hf_file, totals)))
+        if len(batch) >= REPO_STREAM_BATCH:
+            yield separator + b','.join(batch)
+            separator = b','
+            batch = []
+    if batch:
+        yield separator + b','.join(batch)
+    yield b'],' + dumps(totals)[1:]
+
+
 @app.route('/api/check/repo', methods=['POST'])
 def check_repo():
     """
@@ -459,8 +722,7 @@ def check_repo():
         
         hf_files = client.fetch_all_files()
         
-        # Check each file against local cache
-        results = {
+        totals = {
             'repo_id': client.repo_id,
             'repo_type': client.repo_type,
             'revision': client.revision,
@@ -469,72 +731,25 @@ def check_repo():
             'missing': 0,
             'mismatch': 0,
             'found_size': 0,
-            'missing_size': 0,
-            'files': []
+            'missing_size': 0
         }
         
-        for hf_file in hf_files:
-            file_result = {
-                'filename': hf_file.basename,
-                'path': hf_file.path,
-                'sha256': hf_file.sha256,
-                'size': hf_file.size,
-                'status': 'missing',
-                'local_paths': [],
-                'directories': []
-            }
-            
-            sha_lower = (hf_file.sha256 or '').lower()
-            filename_lower = hf_file.basename.lower()
-            
-            # Check by SHA256 first
-            if sha_lower and sha_lower in _hash_cache.sha256_index:
-                matches = _hash_cache.sha256_index[sha_lower]
-                file_result['status'] = 'found'
-                file_result['local_paths'] = [m['path'] for m in matches]
-                file_result['directories'] = list(set(m['directory_name'] for m in matches))
-                results['found'] += 1
-                results['found_size'] += hf_file.size or 0
-            # Check by filename
-            elif filename_lower in _hash_cache.filename_index:
-                matches = _hash_cache.filename_index[filename_lower]
-                # Check if any SHA matches
-                if sha_lower:
-                    sha_matches = [m for m in matches if (m.get('sha256') or '').lower() == sha_lower]
-                    if sha_matches:
-                        file_result['status'] = 'found'
-                        file_result['local_paths'] = [m['path'] for m in sha_matches]
-                        file_result['directories'] = list(set(m['directory_name'] for m in sha_matches))
-                        results['found'] += 1
-                        results['found_size'] += hf_file.size or 0
-                    else:
-                        file_result['status'] = 'mismatch'
-                        file_result['local_paths'] = [m['path'] for m in matches]
-                        file_result['directories'] = list(set(m['directory_name'] for m in matches))
-                        file_result['local_sha256'] = matches[0].get('sha256') if matches else None
-                        results['mismatch'] += 1
-                        results['missing_size'] += hf_file.size or 0
-                else:
-                    # No SHA to compare, consider found by filename
-                    file_result['status'] = 'found'
-                    file_result['local_paths'] = [m['path'] for m in matches]
-                    file_result['directories'] = list(set(m['directory_name'] for m in matches))
-                    results['found'] += 1
-                    results['found_size'] += hf_file.size or 0
-            else:
-                results['missing'] += 1
-                results['missing_size'] += hf_file.size or 0
-            
-            results['files'].append(file_result)
-        
-        return jsonify(results)
+        # Check each file against local cache while the response streams out;
+        # the cache is bound now so a rescan mid-response can't mix two scans
+        return Response(_iter_repo_json(_hash_cache, hf_files, totals), mimetype='application/json')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
 
-def run_server(host: str = "127.0.0.1", port: int = 7860, auto_scan: bool = True):
-    """Run the API server."""
+def run_server(host: str = "127.0.0.1", port: int = 7860, auto_scan: bool = True, dev: bool = False):
+    """
+    Run the API server.
+    
+    Uses waitress when it is installed, which serves requests from a thread
+    pool with less per-request overhead than Flask's development server;
+    dev=True (or no waitress) falls back to app.run.
+    """
     print(f"\n{'='*60}")
     print("HuggingFace File Checker - Local API Server")
     print(f"{'='*60}")
@@ -559,6 +774,15 @@ def run_server(host: str = "127.0.0.1", port: int = 7860, auto_scan: bool = True
     print()
     print("Press Ctrl+C to stop\n")
     
+    if not dev:
+        try:
+            from waitress import serve
+        except ImportError:
+            serve = None
+        if serve is not None:
+            serve(app, host=host, port=port, threads=max(4, os.cpu_count() or 1))
+            return
+    
     app.run(host=host, port=port, debug=False, threaded=True)
 
 